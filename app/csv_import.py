@@ -0,0 +1,63 @@
+"""Background CSV import for OpenKeyFlow."""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+from PyQt5 import QtCore
+
+from backend import storage
+from backend.overlap import OverlapIndex
+
+
+class CsvImportWorker(QtCore.QObject):
+    """Parse a CSV file on a worker thread and hand validated batches to the GUI.
+
+    Batches are emitted through queued signals, so the receiving slots run on
+    the GUI thread and can update storage, the engine and the model directly.
+    Overlapping triggers are collected into a conflict report sent on finish.
+
+    ``overlaps`` is the window's own index of the existing triggers. Accepted
+    rows are added to it as they are read, and rows of a batch dropped by a
+    cancel are taken out again.
+    """
+
+    batchReady = QtCore.pyqtSignal(dict)
+    progress = QtCore.pyqtSignal(int, int)
+    finished = QtCore.pyqtSignal(int, int, bool, dict)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, path: Path, existing: Mapping[str, str], overlaps: OverlapIndex) -> None:
+        super().__init__()
+        self._path = Path(path)
+        self._existing = existing
+        self._overlaps = overlaps
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop after the current batch; safe to call from any thread."""
+        self._cancelled.set()
+
+    def run(self) -> None:
+        imported = 0
+        skipped = 0
+        conflicts: Dict[str, List[str]] = {}
+        try:
+            batches = storage.iter_csv_import_batches(self._path, self._existing, overlaps=self._overlaps)
+            for batch in batches:
+                if self._cancelled.is_set():
+                    self._overlaps.apply_delta(
+                        removed=[trigger for trigger in batch.hotkeys if trigger not in self._existing]
+                    )
+                    break
+                if batch.hotkeys:
+                    self.batchReady.emit(batch.hotkeys)
+                imported += len(batch.hotkeys)
+                skipped += batch.skipped
+                conflicts.update(batch.conflicts)
+                self.progress.emit(batch.bytes_read, batch.total_bytes)
+        except Exception as exc:
+            self.failed.emit(str(exc))
+            return
+        self.finished.emit(imported, skipped, self._cancelled.is_set(), conflicts)
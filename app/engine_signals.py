@@ -0,0 +1,56 @@
+"""Qt signals carrying backend notifications to the GUI thread."""
+from __future__ import annotations
+
+from typing import Dict, List
+
+from PyQt5 import QtCore
+
+from backend.trigger_engine import EVENT_ENABLED, EVENT_ERROR, EVENT_FIRED, TriggerEngine
+
+
+class EngineSignals(QtCore.QObject):
+    """Re-emit a :class:`TriggerEngine`'s notifications as Qt signals.
+
+    The engine calls its listeners on the keyboard hook, injector or caller's
+    thread. Signals emitted there reach slots on the GUI thread through queued
+    connections, so the window updates only when something changed and never
+    touches widgets from another thread.
+    """
+
+    firedChanged = QtCore.pyqtSignal(int)
+    enabledChanged = QtCore.pyqtSignal(bool)
+    errorRaised = QtCore.pyqtSignal(str)
+
+    def __init__(self, engine: TriggerEngine, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._engine = engine
+        engine.add_listener(self._relay)
+
+    def detach(self) -> None:
+        self._engine.remove_listener(self._relay)
+
+    def _relay(self, event: str, value: object) -> None:
+        if event == EVENT_FIRED:
+            self.firedChanged.emit(int(value))
+        elif event == EVENT_ENABLED:
+            self.enabledChanged.emit(bool(value))
+        elif event == EVENT_ERROR:
+            self.errorRaised.emit(str(value))
+
+
+class ReloadSignals(QtCore.QObject):
+    """Re-emit :class:`~backend.hot_reload.HotReloader` callbacks as Qt signals.
+
+    Pass :meth:`hotkeys_changed` and :meth:`config_changed` as the reloader's
+    callbacks; they run on the watcher thread and the connected slots on the
+    GUI thread.
+    """
+
+    hotkeysChanged = QtCore.pyqtSignal(dict, list)
+    configChanged = QtCore.pyqtSignal(dict)
+
+    def hotkeys_changed(self, added: Dict[str, str], removed: List[str]) -> None:
+        self.hotkeysChanged.emit(added, removed)
+
+    def config_changed(self, changes: Dict[str, object]) -> None:
+        self.configChanged.emit(changes)
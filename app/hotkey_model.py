@@ -0,0 +1,151 @@
+"""Table model exposing the hotkey store to Qt views."""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, List, Mapping
+
+from PyQt5 import QtCore
+
+HEADERS = ("Hotkey", "Output")
+# Above this many rows a sorted insert re-sorts once instead of placing each row.
+_BULK_INSERT = 64
+
+
+class HotkeyTableModel(QtCore.QAbstractTableModel):
+    """Read-only two-column view over a live ``{trigger: output}`` mapping.
+
+    The model keeps only the row order as a list of triggers. Cell text is read
+    from the mapping when the view asks for it, which may fetch it from the
+    store. Edits are reported through
+    :meth:`hotkeys_added`, :meth:`hotkeys_changed` and :meth:`hotkeys_removed`,
+    which emit row-level signals instead of resetting the view.
+    """
+
+    def __init__(self, hotkeys: Mapping[str, str], parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._hotkeys = hotkeys
+        self._order: List[str] = list(hotkeys)
+        self._sort_column = -1
+        self._sort_order = QtCore.Qt.AscendingOrder
+
+    # ------------------------------------------------------------------
+    # Qt model interface
+    # ------------------------------------------------------------------
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+            return None
+        trigger = self._order[index.row()]
+        if index.column() == 0:
+            return trigger
+        return self._hotkeys.get(trigger, "")
+
+    def headerData(  # noqa: N802
+        self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole
+    ) -> Any:
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def sort(self, column: int, order: QtCore.Qt.SortOrder = QtCore.Qt.AscendingOrder) -> None:
+        """Reorder the trigger list in place; cell text is never copied."""
+        self._sort_column = column
+        self._sort_order = order
+        if column < 0:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        moved = [(index, self._order[index.row()]) for index in persistent]
+        self._order.sort(key=self._sort_key(), reverse=order == QtCore.Qt.DescendingOrder)
+        if moved:
+            rows = {trigger: row for row, trigger in enumerate(self._order)}
+            self.changePersistentIndexList(
+                [index for index, _ in moved],
+                [self.index(rows[trigger], index.column()) for index, trigger in moved],
+            )
+        self.layoutChanged.emit()
+
+    # ------------------------------------------------------------------
+    # Store notifications
+    # ------------------------------------------------------------------
+    def trigger_at(self, row: int) -> str:
+        return self._order[row]
+
+    def hotkeys_added(self, triggers: Iterable[str]) -> None:
+        """Insert rows for triggers that were just added to the store."""
+        triggers = list(triggers)
+        if not triggers:
+            return
+        if self._sort_column >= 0 and len(triggers) <= _BULK_INSERT:
+            for trigger in triggers:
+                row = self._insert_position(trigger)
+                self.beginInsertRows(QtCore.QModelIndex(), row, row)
+                self._order.insert(row, trigger)
+                self.endInsertRows()
+            return
+        first = len(self._order)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(triggers) - 1)
+        self._order.extend(triggers)
+        self.endInsertRows()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def hotkeys_changed(self, triggers: Iterable[str]) -> None:
+        """Refresh the output cells of triggers whose text was replaced."""
+        changed = set(triggers)
+        if not changed:
+            return
+        for row, trigger in enumerate(self._order):
+            if trigger in changed:
+                index = self.index(row, 1)
+                self.dataChanged.emit(index, index)
+        if self._sort_column == 1:
+            self.sort(self._sort_column, self._sort_order)
+
+    def hotkeys_removed(self, triggers: Iterable[str]) -> None:
+        """Remove the rows of deleted triggers, one contiguous range at a time."""
+        removed = set(triggers)
+        rows = [row for row, trigger in enumerate(self._order) if trigger in removed]
+        while rows:
+            last = rows.pop()
+            first = last
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            del self._order[first : last + 1]
+            self.endRemoveRows()
+
+    def reload(self) -> None:
+        """Rebuild the row order from the store, for wholesale replacements."""
+        self.beginResetModel()
+        self._order = list(self._hotkeys)
+        if self._sort_column >= 0:
+            self._order.sort(key=self._sort_key(), reverse=self._sort_order == QtCore.Qt.DescendingOrder)
+        self.endResetModel()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _sort_key(self) -> Callable[[str], str]:
+        if self._sort_column == 1:
+            hotkeys = self._hotkeys
+            return lambda trigger: hotkeys.get(trigger, "")
+        return str
+
+    def _insert_position(self, trigger: str) -> int:
+        key = self._sort_key()
+        value = key(trigger)
+        descending = self._sort_order == QtCore.Qt.DescendingOrder
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            current = key(self._order[middle])
+            if (current > value) if descending else (current <= value):
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -1,26 +1,147 @@
-"""Application entry point for OpenKeyFlow."""
+"""Application entry point for OpenKeyFlow.
+
+The trigger engine is started from ``backend`` alone before any GUI module is
+imported, so expansions work while Qt is still loading. With ``--headless``
+the GUI is not loaded at all until it is requested with
+:data:`OPEN_WINDOW_HOTKEY`.
+"""
 from __future__ import annotations
 
+import argparse
 import sys
+import threading
+from typing import Dict, List, Tuple
 
-from PyQt5 import QtCore, QtWidgets
+import keyboard
 
 from backend import storage
+from backend.hot_reload import HotReloader
 from backend.trigger_engine import TriggerEngine
-from .main_window import APP_NAME, MainWindow
 
+TOGGLE_HOTKEY = "ctrl+f12"
+OPEN_WINDOW_HOTKEY = "ctrl+shift+f12"
 
-def main() -> None:
-    storage.ensure_data_dir()
-    config = storage.load_config()
-    hotkeys = storage.load_hotkeys()
+
+def start_engine(config: Dict[str, object]) -> Tuple[TriggerEngine, Dict[str, str] | None]:
+    """Build and start the engine from ``config`` and the hotkey store.
+
+    A fresh matcher cache is loaded instead of reading the store. Otherwise
+    the store is read and the cache is rewritten in the background.
+
+    Returns the engine with the hotkeys it was loaded from, for the window to
+    reuse, or ``None`` when the hotkeys were not read in full (they came from
+    the cache, or the store serves outputs lazily and only triggers were read).
+    """
+    storage.set_backend(str(config.get("storage_backend", "json")))
+    output_loader = storage.get_output if storage.lazy_outputs() else None
+    hotkeys = None
+    engine_hotkeys = None
+    matcher = storage.load_matcher_cache()
+    if matcher is None:
+        cache_key = storage.matcher_cache_key()
+        if output_loader is not None:
+            engine_hotkeys = dict.fromkeys(storage.load_triggers(), "")
+        else:
+            hotkeys = engine_hotkeys = storage.load_hotkeys()
 
     engine = TriggerEngine(
-        hotkeys=hotkeys,
+        hotkeys=engine_hotkeys,
+        matcher=matcher,
+        output_loader=output_loader,
         cooldown=float(config.get("cooldown", 0.3)),
         paste_delay=float(config.get("paste_delay", 0.05)),
+        capture_typeahead=bool(config.get("capture_typeahead", False)),
     )
+    apply_engine_config(engine, {"trace_recording": config.get("trace_recording", "off")})
     engine.start()
+    if matcher is None:
+        storage.save_matcher_cache(engine.snapshot.matcher, cache_key)
+    return engine, hotkeys
+
+
+def apply_engine_config(engine: TriggerEngine, changes: Dict[str, object]) -> None:
+    """Apply the changed config keys a running engine can pick up.
+
+    ``storage_backend`` only takes effect after a restart.
+    """
+    if "cooldown" in changes:
+        engine.set_cooldown(float(changes["cooldown"]))
+    if "paste_delay" in changes:
+        engine.set_paste_delay(float(changes["paste_delay"]))
+    if "capture_typeahead" in changes:
+        engine.set_capture_typeahead(bool(changes["capture_typeahead"]))
+    if "trace_recording" in changes:
+        trace_mode = str(changes["trace_recording"])
+        if trace_mode == "off":
+            engine.stop_recording()
+        elif trace_mode in storage.TRACE_MODES:
+            engine.start_recording(storage.TRACE_FILE, redact=trace_mode != "full")
+
+
+def shutdown(engine: TriggerEngine) -> None:
+    """Put back the user's clipboard."""
+    engine.restore_clipboard()
+
+
+def run_headless(
+    engine: TriggerEngine,
+    config: Dict[str, object],
+    hotkeys: Dict[str, str] | None,
+) -> None:
+    """Expand triggers without a GUI until the window is requested."""
+    reloader = None
+    if config.get("hot_reload", True):
+
+        def reload_hotkeys(added: Dict[str, str], removed: List[str]) -> None:
+            # Keep the dict handed to the window current as well.
+            if hotkeys is not None:
+                for trigger in removed:
+                    hotkeys.pop(trigger, None)
+                hotkeys.update(added)
+            engine.apply_delta(added, removed)
+
+        def reload_config(changes: Dict[str, object]) -> None:
+            config.update(changes)
+            apply_engine_config(engine, changes)
+
+        reloader = HotReloader(
+            reload_hotkeys,
+            reload_config,
+            live_hotkeys=None if hotkeys is None else lambda: hotkeys,
+            config=config,
+        )
+        reloader.start()
+    open_requested = threading.Event()
+    keyboard.add_hotkey(TOGGLE_HOTKEY, engine.toggle_enabled)
+    keyboard.add_hotkey(OPEN_WINDOW_HOTKEY, open_requested.set)
+    try:
+        # Wait in slices so Ctrl+C still reaches the main thread on Windows.
+        while not open_requested.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        shutdown(engine)
+        return
+    finally:
+        if reloader is not None:
+            # The window watches the files itself, stamping them when it is
+            # created, so every change seen here must be applied by now.
+            reloader.stop()
+        for hotkey in (TOGGLE_HOTKEY, OPEN_WINDOW_HOTKEY):
+            try:
+                keyboard.remove_hotkey(hotkey)
+            except Exception:
+                pass
+    run_gui(engine, config, hotkeys)
+
+
+def run_gui(
+    engine: TriggerEngine,
+    config: Dict[str, object],
+    hotkeys: Dict[str, str] | None,
+) -> None:
+    from PyQt5 import QtCore, QtWidgets
+
+    from .main_window import APP_NAME, MainWindow
 
     QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling, True)
     QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)
@@ -28,11 +149,29 @@ def main() -> None:
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName(APP_NAME)
 
-    window = MainWindow(engine)
+    window = MainWindow(engine, config=config, hotkeys=hotkeys)
     window.show()
 
     sys.exit(app.exec_())
 
 
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="openkeyflow")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help=f"run without a window; press {OPEN_WINDOW_HOTKEY} to open it",
+    )
+    args = parser.parse_args(argv)
+
+    storage.ensure_data_dir()
+    config = storage.load_config()
+    engine, hotkeys = start_engine(config)
+    if args.headless:
+        run_headless(engine, config, hotkeys)
+    else:
+        run_gui(engine, config, hotkeys)
+
+
 if __name__ == "__main__":
     main()
@@ -4,15 +4,25 @@ from __future__ import annotations
 import os
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List, MutableMapping, Set
 
 import keyboard
 from PIL import Image, ImageDraw, ImageFont
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from backend import storage
+from backend.hot_reload import HotReloader
+from backend.lazy_hotkeys import LazyHotkeys
+from backend.overlap import OverlapIndex
+from backend.search_index import SearchIndex, StoreSearch
 from backend.trigger_engine import TriggerEngine
+from backend.write_behind import WriteBehind
+from .csv_import import CsvImportWorker
+from .engine_signals import EngineSignals, ReloadSignals
+from .hotkey_model import HotkeyTableModel
+from .main import apply_engine_config, shutdown
 
 try:
     from win32com.client import Dispatch
@@ -26,23 +36,65 @@ IDLE_ICON_PATH = ASSETS_DIR / "OpenKeyFlow_idle.ico"
 
 
 class HotkeyFilter(QtCore.QSortFilterProxyModel):
-    def __init__(self) -> None:
+    """Filter rows through a :class:`SearchIndex` kept off the GUI thread.
+
+    Typing restarts a short debounce timer; the query then runs on a worker and
+    its result set replaces the filter only if no newer query was issued. The
+    index is built and updated on the same worker, so a query always sees
+    every change submitted before it. A :class:`StoreSearch` can stand in for
+    the index when outputs stay in the store.
+    """
+
+    DEBOUNCE_MS = 150
+    _resultsReady = QtCore.pyqtSignal(int, object)
+
+    def __init__(self, index: SearchIndex | StoreSearch) -> None:
         super().__init__()
         self.query = ""
+        self._index = index
+        self._matches: Set[str] | None = None
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HotkeySearch")
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._run_query)
+        self._resultsReady.connect(self._apply_results)
 
     def setQuery(self, text: str) -> None:  # noqa: N802 (Qt naming)
         self.query = text.lower()
-        self.invalidateFilter()
+        self._debounce.start()
+
+    def index_changed(self, added: Dict[str, str] | None = None, removed: Iterable[str] = ()) -> None:
+        """Update the index in the background, then re-run the active query."""
+        self._executor.submit(self._index.apply_delta, dict(added or {}), list(removed))
+        if self.query:
+            self._debounce.start()
+
+    def sort(self, column: int, order: QtCore.Qt.SortOrder = QtCore.Qt.AscendingOrder) -> None:
+        # Let the source model reorder its rows in place; the proxy then keeps
+        # source order instead of building its own sorted mapping.
+        self.sourceModel().sort(column, order)
 
     def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:  # noqa: N802
-        if not self.query:
+        if self._matches is None:
             return True
-        model = self.sourceModel()
-        key_idx = model.index(source_row, 0, source_parent)
-        val_idx = model.index(source_row, 1, source_parent)
-        trigger = (model.data(key_idx, QtCore.Qt.DisplayRole) or "").lower()
-        output = (model.data(val_idx, QtCore.Qt.DisplayRole) or "").lower()
-        return self.query in trigger or self.query in output
+        return self.sourceModel().trigger_at(source_row) in self._matches
+
+    def _run_query(self) -> None:
+        self._generation += 1
+        generation = self._generation
+        query = self.query
+        if not query:
+            self._apply_results(generation, None)
+            return
+        self._executor.submit(lambda: self._resultsReady.emit(generation, self._index.query(query)))
+
+    def _apply_results(self, generation: int, matches: Set[str] | None) -> None:
+        if generation != self._generation:
+            return
+        self._matches = matches
+        self.invalidateFilter()
 
 
 def make_status_icon(enabled: bool) -> QtGui.QIcon:
@@ -74,6 +126,26 @@ def make_status_icon(enabled: bool) -> QtGui.QIcon:
     return QtGui.QIcon(pix)
 
 
+_STATUS_ICONS: Dict[bool, QtGui.QIcon] = {}
+_STATUS_DOTS: Dict[bool, QtGui.QPixmap] = {}
+
+
+def status_icon(enabled: bool) -> QtGui.QIcon:
+    """Return the tray icon for ``enabled``, painting it only the first time."""
+    icon = _STATUS_ICONS.get(enabled)
+    if icon is None:
+        icon = _STATUS_ICONS[enabled] = make_status_icon(enabled)
+    return icon
+
+
+def status_dot(enabled: bool) -> QtGui.QPixmap:
+    pixmap = _STATUS_DOTS.get(enabled)
+    if pixmap is None:
+        pixmap = _STATUS_DOTS[enabled] = QtGui.QPixmap(16, 16)
+        pixmap.fill(QtGui.QColor("#2ecc71" if enabled else "#e74c3c"))
+    return pixmap
+
+
 def set_app_palette(dark: bool) -> None:
     app = QtWidgets.QApplication.instance()
     if not app:
@@ -145,9 +217,10 @@ def toggle_autostart(parent: QtWidgets.QWidget) -> None:
             shell = Dispatch("WScript.Shell")
             link = shell.CreateShortcut(str(shortcut))
             link.TargetPath = str(Path(sys.executable))
-            script_path = Path(__file__).resolve().parent / "main.py"
-            link.Arguments = str(script_path)
-            link.WorkingDirectory = str(Path(__file__).resolve().parent)
+            # Start headless at login so expansion is available before Qt loads.
+            root = Path(__file__).resolve().parents[1]
+            link.Arguments = f'"{root / "openkeyflow.py"}" --headless'
+            link.WorkingDirectory = str(root)
             link.IconLocation = link.TargetPath
             link.save()
             QtWidgets.QMessageBox.information(parent, "Autostart", "Autostart enabled.")
@@ -203,18 +276,40 @@ class SpecialAddDialog(QtWidgets.QDialog):
 class MainWindow(QtWidgets.QMainWindow):
     updateCounters = QtCore.pyqtSignal()
 
-    def __init__(self, engine: TriggerEngine) -> None:
+    def __init__(
+        self,
+        engine: TriggerEngine,
+        *,
+        config: Dict[str, object] | None = None,
+        hotkeys: Dict[str, str] | None = None,
+    ) -> None:
+        """Wrap a running ``engine`` already configured from ``config``.
+
+        ``hotkeys`` is the dict the engine was loaded from and becomes the
+        window's working copy; it is read from storage only when not given.
+        When the store serves outputs lazily, only the triggers are read and
+        the table, search and edits fetch outputs from the store on demand.
+        """
         super().__init__()
         self.engine = engine
-        self.hotkeys: Dict[str, str] = storage.load_hotkeys()
-        self.config = storage.load_config()
+        self.hotkeys: MutableMapping[str, str]
+        if hotkeys is not None:
+            self.hotkeys = hotkeys
+        elif storage.lazy_outputs():
+            self.hotkeys = LazyHotkeys(storage.load_output_digests(), self._load_output)
+        else:
+            self.hotkeys = storage.load_hotkeys()
+        self.config = storage.load_config() if config is None else config
         self.dark_mode = bool(self.config.get("dark_mode", False))
-        self.enabled = True
+        self.enabled = engine.snapshot.enabled
         self.hotkey_lock = threading.RLock()
-
-        self.engine.set_cooldown(float(self.config.get("cooldown", 0.3)))
-        self.engine.set_paste_delay(float(self.config.get("paste_delay", 0.05)))
-        self.engine.update_hotkeys(self.hotkeys)
+        # Edits are saved in the background; _shutdown writes what is left.
+        # Until then the engine takes lazily loaded outputs from the queue.
+        self.persistence = WriteBehind(self.hotkeys, self.hotkey_lock, on_written=engine.forget_outputs)
+        engine.set_pending_outputs(self.persistence.pending_output)
+        self._import_thread: QtCore.QThread | None = None
+        self._import_worker: CsvImportWorker | None = None
+        self._import_progress: QtWidgets.QProgressDialog | None = None
 
         self.setWindowTitle(APP_NAME)
         self.setMinimumSize(760, 480)
@@ -263,12 +358,18 @@ class MainWindow(QtWidgets.QMainWindow):
         search_row.addWidget(self.theme_btn)
         layout.addLayout(search_row)
 
-        self.model = QtGui.QStandardItemModel(0, 2, self)
-        self.model.setHorizontalHeaderLabels(["Hotkey", "Output"])
-        self.populate_model()
+        self.model = HotkeyTableModel(self.hotkeys, self)
+        self.overlap_index = OverlapIndex(self.hotkeys)
 
-        self.proxy = HotkeyFilter()
+        lazy = isinstance(self.hotkeys, LazyHotkeys)
+        self.search_index = StoreSearch(self.persistence.pending_changes) if lazy else SearchIndex()
+
+        self.proxy = HotkeyFilter(self.search_index)
         self.proxy.setSourceModel(self.model)
+        if not lazy:
+            # Folding every output takes a while for large libraries; searches
+            # issued meanwhile wait behind it on the search worker.
+            self.proxy.index_changed(self.hotkeys)
 
         self.table = QtWidgets.QTableView()
         self.table.setModel(self.proxy)
@@ -332,13 +433,31 @@ class MainWindow(QtWidgets.QMainWindow):
         self.tray: QtWidgets.QSystemTrayIcon | None = None
         self.refresh_status_ui()
 
-        self.counter_timer = QtCore.QTimer(self)
-        self.counter_timer.setInterval(300)
-        self.counter_timer.timeout.connect(self.refresh_counters_only)
-        self.counter_timer.start()
+        # The engine reports changes as they happen instead of being polled.
+        self.engine_signals = EngineSignals(engine, self)
+        self.engine_signals.firedChanged.connect(self._show_fired_count)
+        self.engine_signals.enabledChanged.connect(self._apply_enabled)
+        self.engine_signals.errorRaised.connect(self._show_engine_error)
+
+        # Edits other programs make to the hotkeys or config are applied as
+        # deltas, parsed and diffed on the watcher thread.
+        self.reloader: HotReloader | None = None
+        if self.config.get("hot_reload", True):
+            self.reload_signals = ReloadSignals(self)
+            self.reload_signals.hotkeysChanged.connect(self._apply_external_hotkeys)
+            self.reload_signals.configChanged.connect(self._apply_external_config)
+            self.reloader = HotReloader(
+                self.reload_signals.hotkeys_changed,
+                self.reload_signals.config_changed,
+                live_hotkeys=None if lazy else self._hotkeys_copy,
+                live_digests=self._hotkey_digests if lazy else None,
+                live_config=self.config.copy,
+                write_behind=self.persistence,
+            )
+            self.reloader.start()
 
         self.tray = QtWidgets.QSystemTrayIcon(self)
-        self.tray.setIcon(make_status_icon(self.enabled))
+        self.tray.setIcon(status_icon(self.enabled))
         tray_menu = QtWidgets.QMenu()
         tray_menu.addAction("Toggle Enabled", self.toggle_enabled)
         tray_menu.addSeparator()
@@ -351,6 +470,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
         keyboard.add_hotkey("ctrl+f12", self.toggle_enabled)
         self._was_hidden_to_tray = False
+        # Every way out (tray Quit, closing the window, a declined use policy)
+        # ends in aboutToQuit, so pending edits are written on each of them.
+        self._shut_down = False
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._shutdown)
 
         set_app_palette(self.dark_mode)
         self.update_theme_button_text()
@@ -359,17 +482,9 @@ class MainWindow(QtWidgets.QMainWindow):
     # ------------------------------------------------------------------
     # UI helpers
     # ------------------------------------------------------------------
-    def populate_model(self) -> None:
-        self.model.setRowCount(0)
-        for trigger, output in self.hotkeys.items():
-            items = [QtGui.QStandardItem(trigger), QtGui.QStandardItem(output)]
-            self.model.appendRow(items)
-
     def refresh_status_ui(self) -> None:
         self.refresh_counters_only()
-        pixmap = QtGui.QPixmap(16, 16)
-        pixmap.fill(QtGui.QColor("#2ecc71" if self.enabled else "#e74c3c"))
-        self.status_dot.setPixmap(pixmap)
+        self.status_dot.setPixmap(status_dot(self.enabled))
         self.toggle_btn.setText("Disable" if self.enabled else "Enable")
         self.toggle_btn.setStyleSheet(
             "background-color: #2ecc71; color: black;"
@@ -377,7 +492,21 @@ class MainWindow(QtWidgets.QMainWindow):
             else "background-color: #e74c3c; color: #d9d9d9;"
         )
         if self.tray is not None:
-            self.tray.setIcon(make_status_icon(self.enabled))
+            self.tray.setIcon(status_icon(self.enabled))
+
+    def _apply_enabled(self, enabled: bool) -> None:
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.refresh_status_ui()
+
+    def _show_fired_count(self, fired: int) -> None:
+        self.fired_count_label.setText(f"Fired: {fired}")
+
+    def _show_engine_error(self, message: str) -> None:
+        if self.tray is not None:
+            self.tray.showMessage(
+                APP_NAME, f"Expansion failed: {message}", QtWidgets.QSystemTrayIcon.Warning
+            )
 
     def _apply_table_header_theme(self) -> None:
         header = self.table.horizontalHeader()
@@ -407,14 +536,13 @@ class MainWindow(QtWidgets.QMainWindow):
 
         if result == QtWidgets.QMessageBox.Ok:
             self.config["accepted_use_policy"] = True
-            storage.save_config(self.config)
+            self.persistence.config_changed(self.config)
         else:
             QtWidgets.QApplication.instance().quit()
 
     def refresh_counters_only(self) -> None:
-        fired = self.engine.get_stats()["fired"]
         self.hotkey_count_label.setText(f"Hotkeys: {len(self.hotkeys)}")
-        self.fired_count_label.setText(f"Fired: {fired}")
+        self._show_fired_count(self.engine.get_stats()["fired"])
 
     def update_theme_button_text(self) -> None:
         self.theme_btn.setText("Dark Mode" if not self.dark_mode else "Light Mode")
@@ -453,11 +581,21 @@ class MainWindow(QtWidgets.QMainWindow):
         event.ignore()
 
     def quit_app(self) -> None:
+        QtWidgets.QApplication.instance().quit()
+
+    def _shutdown(self) -> None:
+        if self._shut_down:
+            return
+        self._shut_down = True
         try:
             keyboard.remove_hotkey("ctrl+f12")
         except Exception:
             pass
-        QtWidgets.QApplication.instance().quit()
+        self.engine_signals.detach()
+        if self.reloader is not None:
+            self.reloader.stop()
+        self.persistence.close()
+        shutdown(self.engine)
 
     # ------------------------------------------------------------------
     # Actions
@@ -483,26 +621,19 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _add_hotkey(self, trigger: str, output: str) -> bool:
         normalized_trigger = trigger.strip()
-        if not normalized_trigger:
-            QtWidgets.QMessageBox.warning(self, "Add Hotkey", "Trigger is required.")
-            return False
-        if " " in normalized_trigger:
-            QtWidgets.QMessageBox.warning(self, "Add Hotkey", "Triggers cannot contain spaces.")
-            return False
-        if not output:
-            QtWidgets.QMessageBox.warning(self, "Add Hotkey", "Output is required.")
+        error = storage.validate_hotkey(normalized_trigger, output)
+        if not error:
+            with self.hotkey_lock:
+                error = storage.validate_template(normalized_trigger, output, self.hotkeys)
+        if error:
+            QtWidgets.QMessageBox.warning(self, "Add Hotkey", error)
             return False
 
         with self.hotkey_lock:
             if normalized_trigger in self.hotkeys:
                 QtWidgets.QMessageBox.warning(self, "Add Hotkey", "Trigger already exists.")
                 return False
-            overlaps = [
-                existing
-                for existing in self.hotkeys
-                if existing != normalized_trigger
-                and (existing.startswith(normalized_trigger) or normalized_trigger.startswith(existing))
-            ]
+            overlaps = self.overlap_index.overlaps(normalized_trigger)
 
         if overlaps:
             overlaps_text = "\n".join(f"• {name}" for name in overlaps)
@@ -524,12 +655,8 @@ class MainWindow(QtWidgets.QMainWindow):
             if normalized_trigger in self.hotkeys:
                 QtWidgets.QMessageBox.warning(self, "Add Hotkey", "Trigger already exists.")
                 return False
-            self.hotkeys[normalized_trigger] = output
 
-        storage.save_hotkeys(self.hotkeys)
-        self.engine.update_hotkeys(self.hotkeys)
-        self.populate_model()
-        self.refresh_status_ui()
+        self._commit_hotkey_changes(added={normalized_trigger: output})
         return True
 
     def delete_selected(self) -> None:
@@ -539,32 +666,151 @@ class MainWindow(QtWidgets.QMainWindow):
         to_delete = []
         for index in selection:
             source = self.proxy.mapToSource(index)
-            trigger = self.model.item(source.row(), 0).text()
-            to_delete.append(trigger)
+            to_delete.append(self.model.trigger_at(source.row()))
         if not to_delete:
             return
+        self._commit_hotkey_changes(removed=to_delete)
+
+    def _hotkeys_copy(self) -> MutableMapping[str, str]:
+        with self.hotkey_lock:
+            return self.hotkeys.copy()
+
+    def _hotkey_digests(self) -> Dict[str, int]:
+        with self.hotkey_lock:
+            return self.hotkeys.digests()
+
+    def _holds(self, trigger: str, output: str) -> bool:
+        if isinstance(self.hotkeys, LazyHotkeys):
+            return self.hotkeys.holds(trigger, output)
+        return self.hotkeys.get(trigger) == output
+
+    def _load_output(self, trigger: str) -> str | None:
+        """Read an output from the store, or its edit not stored yet."""
+        pending, output = self.persistence.pending_output(trigger)
+        return output if pending else storage.get_output(trigger)
+
+    def _apply_external_hotkeys(self, added: Dict[str, str], removed: List[str]) -> None:
+        """Apply a delta read from the store, skipping triggers edited since."""
+        pending = self.persistence.pending_triggers()
         with self.hotkey_lock:
-            for trigger in to_delete:
+            added = {
+                trigger: output
+                for trigger, output in added.items()
+                if trigger not in pending and not self._holds(trigger, output)
+            }
+            removed = [trigger for trigger in removed if trigger not in pending and trigger in self.hotkeys]
+        if added or removed:
+            self._commit_hotkey_changes(added, removed, persist=False)
+
+    def _apply_external_config(self, changes: Dict[str, object]) -> None:
+        self.config.update(changes)
+        apply_engine_config(self.engine, changes)
+        if "dark_mode" in changes and bool(changes["dark_mode"]) != self.dark_mode:
+            self.dark_mode = bool(changes["dark_mode"])
+            set_app_palette(self.dark_mode)
+            self.update_theme_button_text()
+            self._apply_table_header_theme()
+
+    def _commit_hotkey_changes(
+        self,
+        added: Dict[str, str] | None = None,
+        removed: Iterable[str] = (),
+        *,
+        persist: bool = True,
+    ) -> None:
+        """Apply an edit to the hotkey set, storage, engine, search index and table.
+
+        ``persist`` is false for edits read back from storage.
+        """
+        added = added or {}
+        removed = [trigger for trigger in removed if trigger not in added]
+        with self.hotkey_lock:
+            for trigger in removed:
                 self.hotkeys.pop(trigger, None)
-        storage.save_hotkeys(self.hotkeys)
-        self.engine.update_hotkeys(self.hotkeys)
-        self.populate_model()
-        self.refresh_status_ui()
+            new = [trigger for trigger in added if trigger not in self.hotkeys]
+            self.hotkeys.update(added)
+        if persist:
+            self.persistence.hotkeys_changed(added, removed)
+        self.engine.apply_delta(added, removed)
+        self.overlap_index.apply_delta(added, removed)
+        self.model.hotkeys_removed(removed)
+        self.model.hotkeys_added(new)
+        if len(new) < len(added):
+            self.model.hotkeys_changed(set(added).difference(new))
+        self.proxy.index_changed(added, removed)
+        self.refresh_counters_only()
 
     def import_csv(self) -> None:
+        if self._import_thread is not None:
+            QtWidgets.QMessageBox.information(self, "Import", "An import is already running.")
+            return
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import CSV", "", "CSV Files (*.csv)")
         if not path:
             return
-        added = 0
-        with self.hotkey_lock:
-            for trigger, output in storage.import_hotkeys_from_csv(Path(path)):
-                self.hotkeys[trigger] = output
-                added += 1
-        storage.save_hotkeys(self.hotkeys)
-        self.engine.update_hotkeys(self.hotkeys)
-        self.populate_model()
-        self.refresh_status_ui()
-        QtWidgets.QMessageBox.information(self, "Import", f"Imported {added} hotkeys.")
+
+        existing = self._hotkeys_copy()
+        self._import_thread = QtCore.QThread(self)
+        self._import_worker = CsvImportWorker(Path(path), existing, self.overlap_index)
+        self._import_worker.moveToThread(self._import_thread)
+        self._import_thread.started.connect(self._import_worker.run)
+        self._import_worker.batchReady.connect(self._apply_import_batch)
+        self._import_worker.progress.connect(self._update_import_progress)
+        self._import_worker.finished.connect(self._finish_import)
+        self._import_worker.failed.connect(self._fail_import)
+
+        self._import_progress = QtWidgets.QProgressDialog("Importing hotkeys…", "Cancel", 0, 100, self)
+        self._import_progress.setWindowTitle("Import")
+        self._import_progress.setMinimumDuration(300)
+        # The worker's thread is busy in run(), so a queued call would only be
+        # delivered once the import is over; set the flag from this thread.
+        self._import_progress.canceled.connect(self._import_worker.cancel, QtCore.Qt.DirectConnection)
+        self._import_thread.start()
+
+    def _apply_import_batch(self, batch: Dict[str, str]) -> None:
+        self._commit_hotkey_changes(added=batch)
+
+    def _update_import_progress(self, done: int, total: int) -> None:
+        if self._import_progress is not None and total:
+            self._import_progress.setValue(int(done * 100 / total))
+
+    def _finish_import(
+        self, imported: int, skipped: int, cancelled: bool, conflicts: Dict[str, List[str]]
+    ) -> None:
+        self._end_import()
+        message = f"Imported {imported} hotkeys."
+        if skipped:
+            message += f"\nSkipped {skipped} duplicate or invalid rows."
+        if cancelled:
+            message = "Import cancelled. " + message
+        msg = QtWidgets.QMessageBox(self)
+        msg.setWindowTitle("Import")
+        msg.setIcon(QtWidgets.QMessageBox.Information)
+        if conflicts:
+            msg.setIcon(QtWidgets.QMessageBox.Warning)
+            message += (
+                f"\n\n{len(conflicts)} imported triggers overlap others and may cause "
+                "unreliable expansions. See details."
+            )
+            msg.setDetailedText(
+                "\n".join(f"{trigger}: {', '.join(others)}" for trigger, others in conflicts.items())
+            )
+        msg.setText(message)
+        msg.exec_()
+
+    def _fail_import(self, error: str) -> None:
+        self._end_import()
+        QtWidgets.QMessageBox.warning(self, "Import", f"Import failed:\n{error}")
+
+    def _end_import(self) -> None:
+        if self._import_progress is not None:
+            self._import_progress.close()
+            self._import_progress = None
+        if self._import_thread is not None:
+            self._import_thread.quit()
+            self._import_thread.wait()
+            self._import_thread = None
+        self._import_worker = None
+        self.refresh_counters_only()
 
     def export_csv(self) -> None:
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export CSV", "", "CSV Files (*.csv)")
@@ -574,8 +820,9 @@ class MainWindow(QtWidgets.QMainWindow):
         QtWidgets.QMessageBox.information(self, "Export", f"Exported {len(self.hotkeys)} hotkeys.")
 
     def toggle_enabled(self) -> None:
-        self.enabled = self.engine.toggle_enabled()
-        self.refresh_status_ui()
+        # Also called from the keyboard thread by the global hotkey, so only
+        # the engine is touched; the UI follows through ``enabledChanged``.
+        self.engine.toggle_enabled()
 
     def toggle_theme(self) -> None:
         self.dark_mode = not self.dark_mode
@@ -583,4 +830,4 @@ class MainWindow(QtWidgets.QMainWindow):
         self.update_theme_button_text()
         self._apply_table_header_theme()
         self.config["dark_mode"] = self.dark_mode
-        storage.save_config(self.config)
+        self.persistence.config_changed(self.config)
@@ -1,5 +1,6 @@
 """Backend helpers for OpenKeyFlow."""
 from . import storage  # noqa: F401
+from .clipboard import ClipboardSession  # noqa: F401
 from .trigger_engine import TriggerEngine, safe_write  # noqa: F401
 
-__all__ = ["storage", "TriggerEngine", "safe_write"]
+__all__ = ["storage", "ClipboardSession", "TriggerEngine", "safe_write"]
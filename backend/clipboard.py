@@ -0,0 +1,131 @@
+"""Clipboard-based text injection for OpenKeyFlow."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import keyboard
+
+from .metrics import EngineMetrics
+
+try:
+    import pyperclip
+except ImportError:  # pragma: no cover - optional dependency
+    pyperclip = None  # type: ignore
+
+# Seconds without an expansion before the user's clipboard is put back.
+RESTORE_IDLE = 0.5
+
+_NOTHING = object()
+
+
+class ClipboardSession:
+    """Paste through the clipboard, restoring the user's content lazily.
+
+    The user's clipboard is saved on the first paste of a burst and restored
+    once no paste has happened for ``restore_idle`` seconds. Pastes in between
+    only check that the clipboard still holds the previous expansion, which is
+    cheap compared with the user's content. If it does not, the user copied
+    something new and that becomes the content to restore. Copies are skipped
+    when the clipboard already holds the text being pasted or being restored.
+    A restore is also skipped when the user replaced the expansion in the
+    meantime.
+
+    ``backend`` is any object with pyperclip's ``paste()``/``copy()``; without
+    one, text is typed with ``keyboard.write`` instead.
+    """
+
+    def __init__(self, backend: Any = None, *, restore_idle: float = RESTORE_IDLE) -> None:
+        self._backend = backend
+        self.restore_idle = max(0.0, restore_idle)
+        # Held for a whole paste, so a restore never lands mid-paste.
+        self._lock = threading.Lock()
+        self._saved: object = _NOTHING
+        self._pasted: str | None = None
+        self._restore_at = 0.0
+        self._restorer: threading.Thread | None = None
+        self._restore_metrics: EngineMetrics | None = None
+
+    def paste(
+        self,
+        text: str,
+        *,
+        paste_delay: float = 0.05,
+        metrics: EngineMetrics | None = None,
+    ) -> None:
+        timed = metrics is not None and metrics.enabled
+        start = time.perf_counter_ns() if timed else 0
+        with self._lock:
+            try:
+                if self._backend is None:
+                    raise RuntimeError("no clipboard backend")
+                current = self._backend.paste()
+            except Exception:
+                keyboard.write(text, delay=0)
+                if timed:
+                    metrics.paste.record(time.perf_counter_ns() - start)
+                return
+            if self._saved is _NOTHING or current != self._pasted:
+                self._saved = current
+            try:
+                if current != text:
+                    self._backend.copy(text)
+                self._pasted = text
+                time.sleep(paste_delay)
+                keyboard.send("ctrl+v")
+                time.sleep(paste_delay)
+            finally:
+                if timed:
+                    metrics.paste.record(time.perf_counter_ns() - start)
+                self._restore_metrics = metrics
+                self._schedule_restore_locked()
+
+    def user_text(self) -> str:
+        """Return the user's clipboard text, not an expansion pasted over it."""
+        with self._lock:
+            try:
+                current = self._backend.paste()
+            except Exception:
+                return ""
+            if self._saved is not _NOTHING and current == self._pasted:
+                current = self._saved
+        return current if isinstance(current, str) else ""
+
+    def restore(self) -> None:
+        """Put the user's clipboard back now instead of after the idle window."""
+        with self._lock:
+            self._restore_locked()
+
+    def _schedule_restore_locked(self) -> None:
+        self._restore_at = time.monotonic() + self.restore_idle
+        if self._restorer is None:
+            self._restorer = threading.Thread(
+                target=self._restore_when_idle, name="ClipboardRestore", daemon=True
+            )
+            self._restorer.start()
+
+    def _restore_when_idle(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._restore_at - time.monotonic()
+                if delay <= 0:
+                    self._restorer = None
+                    self._restore_locked()
+                    return
+            time.sleep(delay)
+
+    def _restore_locked(self) -> None:
+        saved, self._saved = self._saved, _NOTHING
+        if saved is _NOTHING:
+            return
+        metrics = self._restore_metrics
+        timed = metrics is not None and metrics.enabled
+        start = time.perf_counter_ns() if timed else 0
+        try:
+            if saved != self._pasted and self._backend.paste() == self._pasted:
+                self._backend.copy(saved)
+        except Exception:
+            pass
+        if timed:
+            metrics.restore.record(time.perf_counter_ns() - start)
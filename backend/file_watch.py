@@ -0,0 +1,100 @@
+"""Polling file watcher for OpenKeyFlow."""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+# Seconds between polls.
+POLL_INTERVAL = 1.0
+
+Stamp = Tuple[Tuple[int, int, int] | None, ...]
+
+
+def stamp(paths: Sequence[Path]) -> Stamp:
+    """Return the modification time, size and inode of each path, or ``None``."""
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamps.append(None)
+            continue
+        stamps.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(stamps)
+
+
+class _Watch:
+    __slots__ = ("paths", "callback", "stamp", "candidate")
+
+    def __init__(self, paths: Callable[[], Sequence[Path]], callback: Callable[[], None]) -> None:
+        self.paths = paths
+        self.callback = callback
+        self.stamp = stamp(paths())
+        self.candidate: Stamp | None = None
+
+
+class FileWatcher:
+    """Poll groups of files and call back when one of them changes.
+
+    Each poll costs one ``stat`` per file, compared with the cached result, so
+    it works on any platform or filesystem, network shares included. A change
+    is reported once the files' stat has stayed the same for a whole poll,
+    so a file still being written in place is not read half-way. Callbacks
+    run on the watcher thread.
+    """
+
+    def __init__(self, interval: float = POLL_INTERVAL) -> None:
+        self.interval = interval
+        self._watches: List[_Watch] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, paths: Callable[[], Sequence[Path]], callback: Callable[[], None]) -> None:
+        """Call ``callback`` when any file listed by ``paths`` changes.
+
+        ``paths`` is called on each poll, so the list may follow settings such
+        as the storage backend. Files that do not exist yet are watched too.
+        """
+        with self._lock:
+            self._watches.append(_Watch(paths, callback))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for a poll in progress to finish its callbacks."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def poll(self) -> None:
+        """Check every watched group once, calling back for settled changes."""
+        with self._lock:
+            watches = list(self._watches)
+        for watch in watches:
+            current = stamp(watch.paths())
+            if current == watch.stamp:
+                watch.candidate = None
+                continue
+            if current != watch.candidate:
+                # Changed since the last poll; wait for it to settle.
+                watch.candidate = current
+                continue
+            watch.stamp = current
+            watch.candidate = None
+            try:
+                watch.callback()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
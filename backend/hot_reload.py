@@ -0,0 +1,139 @@
+"""Hot reload of hotkeys and config edited outside OpenKeyFlow."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Callable, Dict, List
+
+from . import storage
+from .file_watch import POLL_INTERVAL, FileWatcher, stamp
+from .write_behind import WriteBehind
+
+
+def _same(output: str) -> str:
+    return output
+
+
+class HotReloader:
+    """Apply edits made to the hotkey store or config file by other programs.
+
+    A :class:`FileWatcher` polls the active backend's store files and the
+    config file. When they change, the new contents are parsed on the watcher
+    thread and compared with the live state. Only the hotkeys that differ are
+    passed to ``on_hotkeys(added, removed)``, and only the changed settings to
+    ``on_config(changes)``. Both callbacks run on the watcher thread.
+
+    The live state comes from ``live_hotkeys`` and ``live_config`` when the
+    caller keeps its own copy, as the window does; ``live_digests`` stands in
+    for ``live_hotkeys`` when the caller keeps only the ``hash()`` of each
+    output. Otherwise the reloader tracks what it last applied, starting from
+    ``hotkeys`` and ``config``.
+    Without ``hotkeys``, the store is read in the background. Triggers and
+    settings with unsaved edits in ``write_behind`` are left alone, so a
+    reload never reverts them.
+    """
+
+    def __init__(
+        self,
+        on_hotkeys: Callable[[Dict[str, str], List[str]], None],
+        on_config: Callable[[Dict[str, object]], None],
+        *,
+        live_hotkeys: Callable[[], Dict[str, str]] | None = None,
+        live_digests: Callable[[], Dict[str, int]] | None = None,
+        live_config: Callable[[], Dict[str, object]] | None = None,
+        hotkeys: Dict[str, str] | None = None,
+        config: Dict[str, object] | None = None,
+        write_behind: WriteBehind | None = None,
+        interval: float = POLL_INTERVAL,
+    ) -> None:
+        self._on_hotkeys = on_hotkeys
+        self._on_config = on_config
+        self._live_hotkeys = live_hotkeys
+        self._live_digests = live_digests
+        self._tracking = live_hotkeys is None and live_digests is None
+        self._live_config = live_config
+        self._known_hotkeys = None if hotkeys is None else dict(hotkeys)
+        self._known_config = dict(config if config is not None else storage.load_config())
+        self._write_behind = write_behind
+        self._baseline: threading.Thread | None = None
+        self._watcher = FileWatcher(interval)
+        self._watcher.watch(storage.store_files, self._reload_hotkeys)
+        self._watcher.watch(lambda: [storage.CONFIG_FILE], self._reload_config)
+
+    def start(self) -> None:
+        if self._tracking and self._known_hotkeys is None and self._baseline is None:
+            self._baseline = threading.Thread(
+                target=self._load_baseline, name="HotReloadBaseline", daemon=True
+            )
+            self._baseline.start()
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop watching; no callback runs once this returns."""
+        self._watcher.stop()
+
+    def poll(self) -> None:
+        """Check for changes once, on the calling thread."""
+        self._watcher.poll()
+
+    # ------------------------------------------------------------------
+    # Internal logic
+    # ------------------------------------------------------------------
+    def _load_baseline(self) -> None:
+        try:
+            self._known_hotkeys = storage.load_hotkeys(strict=True)
+        except (OSError, ValueError, sqlite3.Error):
+            self._known_hotkeys = {}
+
+    def _reload_hotkeys(self) -> None:
+        paths = storage.store_files()
+        before = stamp(paths)
+        try:
+            stored = storage.load_hotkeys(strict=True)
+        except (OSError, ValueError, sqlite3.Error):
+            # Malformed or unreadable; wait for the next write.
+            return
+        digest = _same
+        if self._live_digests is not None:
+            live: Dict[str, object] = self._live_digests()
+            digest = hash
+        elif self._live_hotkeys is not None:
+            live = self._live_hotkeys()
+        else:
+            if self._baseline is not None:
+                self._baseline.join()
+            live = self._known_hotkeys or {}
+        skipped = self._write_behind.pending_triggers() if self._write_behind is not None else set()
+        added = {
+            trigger: output
+            for trigger, output in stored.items()
+            if live.get(trigger) != digest(output) and trigger not in skipped
+        }
+        removed = [trigger for trigger in live if trigger not in stored and trigger not in skipped]
+        if stamp(paths) != before:
+            # Written again while being read; the watcher reports it again.
+            return
+        if not added and not removed:
+            return
+        self._on_hotkeys(added, removed)
+        if self._tracking:
+            known = dict(live)
+            for trigger in removed:
+                known.pop(trigger, None)
+            known.update(added)
+            self._known_hotkeys = known
+
+    def _reload_config(self) -> None:
+        if self._write_behind is not None and self._write_behind.config_pending:
+            return
+        try:
+            stored = storage.load_config()
+        except (OSError, ValueError):
+            return
+        live = self._live_config() if self._live_config is not None else self._known_config
+        changes = {key: value for key, value in stored.items() if live.get(key) != value}
+        if not changes:
+            return
+        self._on_config(changes)
+        if self._live_config is None:
+            self._known_config.update(changes)
@@ -0,0 +1,86 @@
+"""Typed-history buffer for OpenKeyFlow."""
+from __future__ import annotations
+
+from typing import List
+
+
+class KeyRing:
+    """Fixed-capacity ring holding the most recently typed characters.
+
+    Slots are preallocated, so appending, deleting and clearing never build new
+    strings. Indexing mirrors ``str``: ``ring[-1]`` is the last typed character,
+    which lets matchers walk the history without copying it.
+    """
+
+    __slots__ = ("_slots", "_capacity", "_end", "_size")
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._capacity = max(0, capacity)
+        self._slots: List[str] = [""] * self._capacity
+        self._end = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("KeyRing index out of range")
+        return self._slots[(self._end - self._size + index) % self._capacity]
+
+    def __str__(self) -> str:
+        return "".join(self[index] for index in range(self._size))
+
+    def back(self, offset: int) -> str:
+        """Return the character typed ``offset`` keys ago, ``1`` being the last.
+
+        Unlike indexing there is no bounds check; ``offset`` must be between
+        1 and ``len(self)``.
+        """
+        return self._slots[(self._end - offset) % self._capacity]
+
+    def tail(self, count: int) -> str:
+        """Return the last ``count`` characters (fewer if not yet typed)."""
+        count = min(count, self._size)
+        if count <= 0:
+            return ""
+        start = (self._end - count) % self._capacity
+        if start < self._end:
+            return "".join(self._slots[start : self._end])
+        return "".join(self._slots[start:]) + "".join(self._slots[: self._end])
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def append(self, char: str) -> None:
+        if not self._capacity:
+            return
+        self._slots[self._end] = char
+        self._end = (self._end + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def pop(self) -> None:
+        """Drop the last character, like a backspace. Empty rings are left alone."""
+        if self._size:
+            self._end = (self._end - 1) % self._capacity
+            self._size -= 1
+
+    def clear(self) -> None:
+        self._end = 0
+        self._size = 0
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity, keeping the newest characters that still fit."""
+        capacity = max(0, capacity)
+        if capacity == self._capacity:
+            return
+        keep = min(self._size, capacity)
+        tail = [self[index] for index in range(self._size - keep, self._size)]
+        self._capacity = capacity
+        self._slots = tail + [""] * (capacity - keep)
+        self._size = keep
+        self._end = keep % capacity if capacity else 0
@@ -0,0 +1,61 @@
+"""Hotkeys whose outputs stay in the store for OpenKeyFlow."""
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator
+
+
+class LazyHotkeys(MutableMapping):
+    """Mapping of triggers to outputs that keeps only the triggers in memory.
+
+    Outputs are read through ``load`` each time they are asked for, so callers
+    must store an output before or as they assign it. Each trigger keeps the
+    ``hash()`` of its output instead, which lets :meth:`holds` and the hot
+    reloader tell a changed output apart without reading it back.
+    """
+
+    def __init__(self, digests: Dict[str, int], load: Callable[[str], str | None]) -> None:
+        self._digests = digests
+        self._load = load
+
+    def __getitem__(self, trigger: str) -> str:
+        if trigger not in self._digests:
+            raise KeyError(trigger)
+        output = self._load(trigger)
+        if output is None:
+            raise KeyError(trigger)
+        return output
+
+    def __setitem__(self, trigger: str, output: str) -> None:
+        self._digests[trigger] = hash(output)
+
+    def __delitem__(self, trigger: str) -> None:
+        del self._digests[trigger]
+
+    def __contains__(self, trigger: object) -> bool:
+        return trigger in self._digests
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._digests)
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def pop(self, trigger: str, *default: str | None) -> str | None:
+        """Remove ``trigger`` even when its output is already gone from the store."""
+        try:
+            return super().pop(trigger, *default)
+        finally:
+            self._digests.pop(trigger, None)
+
+    def holds(self, trigger: str, output: str) -> bool:
+        """Whether ``trigger`` is mapped to ``output``, without loading it."""
+        return self._digests.get(trigger) == hash(output)
+
+    def digests(self) -> Dict[str, int]:
+        """Return a copy of the trigger to output hash map."""
+        return dict(self._digests)
+
+    def copy(self) -> "LazyHotkeys":
+        """Copy the triggers; outputs are still loaded from the store."""
+        return LazyHotkeys(self.digests(), self._load)
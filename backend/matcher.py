@@ -0,0 +1,192 @@
+"""Trigger matching structures for OpenKeyFlow."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .keybuffer import KeyRing
+from .patterns import PATTERN_WINDOW, PatternSet, is_pattern
+
+
+class SuffixMatcher:
+    """Per-length trigger dicts that find the longest trigger ending the buffer.
+
+    Triggers are grouped by length. The last typed character selects the
+    lengths that have a trigger ending in it, longest first; a keystroke no
+    trigger ends with costs one dict lookup. For each of those lengths, the
+    character typed that far back is checked against the characters its
+    triggers start with, and only a length passing both checks builds its
+    suffix string for one dict lookup, so most keystrokes allocate nothing.
+    The work per keystroke is bounded by the number of distinct trigger
+    lengths rather than by the number of triggers, and each trigger costs one
+    dict entry, about what the hotkeys dict itself costs.
+
+    Pattern triggers (``re:...``) are kept apart in a :class:`PatternSet`,
+    which the keyboard hook steps one character at a time; :meth:`match` only
+    covers literal triggers.
+
+    Matchers are immutable once built. :meth:`updated` returns a new matcher
+    that copies only the length buckets holding changed triggers and shares
+    the rest, so readers may keep using an old matcher while a new one is
+    being prepared.
+    """
+
+    def __init__(self, hotkeys: Dict[str, str] | None = None) -> None:
+        self._buckets: Dict[int, Dict[str, str]] = {}
+        patterns = {}
+        for trigger, output in (hotkeys or {}).items():
+            if is_pattern(trigger):
+                patterns[trigger] = output
+            elif trigger:
+                bucket = self._buckets.get(len(trigger))
+                if bucket is None:
+                    bucket = self._buckets[len(trigger)] = {}
+                bucket[trigger] = output
+        self._patterns = PatternSet(patterns) if patterns else None
+        self._starts: Dict[int, frozenset] = {}
+        self._last: Dict[int, frozenset] = {}
+        self._index(self._buckets)
+
+    @classmethod
+    def from_state(
+        cls,
+        buckets: Dict[int, Dict[str, str]],
+        patterns: Dict[str, str] | None = None,
+    ) -> SuffixMatcher:
+        """Rebuild a matcher from the parts returned by :meth:`state`."""
+        matcher = cls.__new__(cls)
+        matcher._buckets = buckets
+        matcher._patterns = PatternSet(patterns) if patterns else None
+        matcher._starts = {}
+        matcher._last = {}
+        matcher._index(buckets)
+        return matcher
+
+    def state(self) -> Tuple[Dict[int, Dict[str, str]], Dict[str, str]]:
+        """Return the literal triggers by length and the pattern triggers.
+
+        The buckets are shared with this matcher and with its updated copies,
+        so they must not be modified. Patterns are compiled again on load.
+        """
+        patterns = self._patterns.hotkeys if self._patterns is not None else {}
+        return self._buckets, patterns
+
+    def __len__(self) -> int:
+        return self._size + (len(self._patterns) if self._patterns is not None else 0)
+
+    @property
+    def max_len(self) -> int:
+        """Length of the longest literal trigger."""
+        return self._max_len
+
+    @property
+    def window(self) -> int:
+        """Typed characters the hook must keep to match every trigger."""
+        if self._patterns is None:
+            return self._max_len
+        return max(self._max_len, PATTERN_WINDOW)
+
+    @property
+    def patterns(self) -> PatternSet | None:
+        return self._patterns
+
+    def updated(
+        self,
+        added: Dict[str, str] | None = None,
+        removed: Iterable[str] = (),
+    ) -> SuffixMatcher:
+        """Return a copy with ``removed`` dropped, then ``added`` inserted."""
+        clone = SuffixMatcher.__new__(SuffixMatcher)
+        clone._buckets = dict(self._buckets)
+        clone._patterns = self._patterns
+        clone._starts = dict(self._starts)
+        clone._last = dict(self._last)
+        # Buckets copied for this update; the others are shared.
+        owned: Set[int] = set()
+
+        def own(length: int) -> Dict[str, str]:
+            bucket = clone._buckets.get(length)
+            if bucket is None:
+                bucket = clone._buckets[length] = {}
+                owned.add(length)
+            elif length not in owned:
+                bucket = clone._buckets[length] = dict(bucket)
+                owned.add(length)
+            return bucket
+
+        patterns = self._patterns.hotkeys if self._patterns is not None else {}
+        patterns_changed = False
+        for trigger in removed:
+            if is_pattern(trigger):
+                if trigger in patterns:
+                    del patterns[trigger]
+                    patterns_changed = True
+            elif trigger in clone._buckets.get(len(trigger), ()):
+                bucket = own(len(trigger))
+                del bucket[trigger]
+                if not bucket:
+                    del clone._buckets[len(trigger)]
+        for trigger, output in (added or {}).items():
+            if is_pattern(trigger):
+                patterns[trigger] = output
+                patterns_changed = True
+            elif trigger:
+                own(len(trigger))[trigger] = output
+        if patterns_changed:
+            # The automaton is rebuilt whole; pattern sets are small and the
+            # literal buckets still share everything untouched.
+            clone._patterns = PatternSet(patterns) if patterns else None
+        clone._index(owned)
+        return clone
+
+    def lookup(self, trigger: str) -> Tuple[str, str] | None:
+        """Return the ``(trigger, output)`` stored for exactly ``trigger``."""
+        if is_pattern(trigger):
+            return self._patterns.lookup(trigger) if self._patterns is not None else None
+        bucket = self._buckets.get(len(trigger))
+        if bucket is None or trigger not in bucket:
+            return None
+        return trigger, bucket[trigger]
+
+    def match(self, buffer: str | KeyRing) -> Tuple[str, str] | None:
+        """Return the longest ``(trigger, output)`` that ends ``buffer``."""
+        size = len(buffer)
+        if not size:
+            return None
+        lengths = self._by_last.get(buffer[-1])
+        if lengths is None:
+            return None
+        # Only a length whose first and last characters both fit builds the
+        # suffix string it is looked up by.
+        if isinstance(buffer, KeyRing):
+            back = buffer.back
+            for length, bucket, starts in lengths:
+                if length <= size and back(length) in starts:
+                    suffix = buffer.tail(length)
+                    if suffix in bucket:
+                        return suffix, bucket[suffix]
+            return None
+        for length, bucket, starts in lengths:
+            if length <= size and buffer[-length] in starts:
+                suffix = buffer[-length:]
+                if suffix in bucket:
+                    return suffix, bucket[suffix]
+        return None
+
+    def _index(self, changed: Iterable[int]) -> None:
+        """Recompute the derived fields after the ``changed`` lengths' buckets changed."""
+        for length in changed:
+            bucket = self._buckets.get(length)
+            if bucket:
+                self._starts[length] = frozenset(trigger[0] for trigger in bucket)
+                self._last[length] = frozenset(trigger[-1] for trigger in bucket)
+            else:
+                self._starts.pop(length, None)
+                self._last.pop(length, None)
+        by_last: Dict[str, List[Tuple[int, Dict[str, str], frozenset]]] = {}
+        for length, bucket in sorted(self._buckets.items(), reverse=True):
+            entry = (length, bucket, self._starts[length])
+            for char in self._last[length]:
+                by_last.setdefault(char, []).append(entry)
+        self._by_last = {char: tuple(entries) for char, entries in by_last.items()}
+        self._max_len = max(self._buckets, default=0)
+        self._size = sum(len(bucket) for bucket in self._buckets.values())
@@ -0,0 +1,106 @@
+"""Low-overhead latency instrumentation for the trigger engine."""
+from __future__ import annotations
+
+from typing import Dict, List
+
+# Bucket ``b`` counts samples with ``ns.bit_length() == b``, i.e. latencies in
+# ``[2 ** (b - 1), 2 ** b)`` nanoseconds. 40 buckets reach past nine minutes.
+BUCKETS = 40
+PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram:
+    """Power-of-two latency histogram with preallocated counters.
+
+    Recording a sample only bumps existing counters, so it is safe to call on
+    the keyboard hook's hot path. Percentiles are reported as the upper bound
+    of the bucket they fall in, capped at the largest recorded sample.
+    """
+
+    __slots__ = ("_counts", "count", "total_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self._counts: List[int] = [0] * BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        bucket = ns.bit_length()
+        self._counts[bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def reset(self) -> None:
+        for bucket in range(BUCKETS):
+            self._counts[bucket] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        counts = list(self._counts)
+        count = sum(counts)
+        result: Dict[str, float] = {
+            "count": count,
+            "mean_us": (self.total_ns / count / 1000) if count else 0.0,
+            "max_us": self.max_ns / 1000,
+        }
+        for percentile in PERCENTILES:
+            upper_ns = _percentile_ns(counts, count, percentile)
+            result[f"p{percentile}_us"] = min(upper_ns, self.max_ns) / 1000
+        return result
+
+
+def _percentile_ns(counts: List[int], count: int, percentile: int) -> int:
+    if not count:
+        return 0
+    threshold = count * percentile / 100
+    seen = 0
+    for bucket, bucket_count in enumerate(counts):
+        seen += bucket_count
+        if seen >= threshold:
+            return (1 << bucket) - 1 if bucket else 0
+    return (1 << (BUCKETS - 1)) - 1
+
+
+class EngineMetrics:
+    """Histograms and counters for one :class:`TriggerEngine`.
+
+    ``hook`` covers the whole keyboard callback and ``match`` the matcher call
+    inside it. ``backspace``, ``paste`` and ``restore`` time the phases of an
+    injection. ``dropped`` counts keys ignored while an expansion was pending,
+    ``suppressed`` counts keys held back for type-ahead replay and
+    ``cancelled`` counts queued expansions dropped by disabling the engine.
+    Nothing is recorded while ``enabled`` is false.
+    """
+
+    HISTOGRAMS = ("hook", "match", "backspace", "paste", "restore")
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.hook = LatencyHistogram()
+        self.match = LatencyHistogram()
+        self.backspace = LatencyHistogram()
+        self.paste = LatencyHistogram()
+        self.restore = LatencyHistogram()
+        self.dropped = 0
+        self.suppressed = 0
+        self.cancelled = 0
+
+    def reset(self) -> None:
+        for name in self.HISTOGRAMS:
+            getattr(self, name).reset()
+        self.dropped = 0
+        self.suppressed = 0
+        self.cancelled = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        result: Dict[str, object] = {name: getattr(self, name).snapshot() for name in self.HISTOGRAMS}
+        result["enabled"] = self.enabled
+        result["dropped"] = self.dropped
+        result["suppressed"] = self.suppressed
+        result["cancelled"] = self.cancelled
+        return result
@@ -0,0 +1,112 @@
+"""Trigger overlap detection for OpenKeyFlow."""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set
+
+
+def _remove_sorted(keys: List[str], key: str) -> None:
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+def _extensions(keys: List[str], key: str) -> Iterable[str]:
+    """Yield the sorted ``keys`` that start with ``key``, ``key`` included."""
+    index = bisect_left(keys, key)
+    while index < len(keys) and keys[index].startswith(key):
+        yield keys[index]
+        index += 1
+
+
+class OverlapIndex:
+    """Find triggers that overlap a given trigger at either end.
+
+    Two triggers overlap when one starts or ends with the other. Either way,
+    typing the longer one can fire the shorter one, or the shorter one can
+    stop firing. Triggers are kept in a set and in two sorted lists, one of
+    them holding each trigger reversed. Shorter overlapping triggers are
+    found by looking up each prefix and suffix in the set. Longer ones sit
+    right after the trigger in the matching sorted list and are found by
+    bisection. The index may be shared between threads.
+    """
+
+    def __init__(self, triggers: Iterable[str] = ()) -> None:
+        self._triggers: Set[str] = {trigger for trigger in triggers if trigger}
+        self._forward = sorted(self._triggers)
+        self._reverse = sorted(trigger[::-1] for trigger in self._triggers)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def __contains__(self, trigger: object) -> bool:
+        return trigger in self._triggers
+
+    def add(self, trigger: str) -> None:
+        with self._lock:
+            self._add_locked(trigger)
+
+    def remove(self, trigger: str) -> None:
+        with self._lock:
+            self._remove_locked(trigger)
+
+    def apply_delta(self, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        with self._lock:
+            for trigger in removed:
+                self._remove_locked(trigger)
+            for trigger in added:
+                self._add_locked(trigger)
+
+    def overlaps(self, trigger: str) -> List[str]:
+        """Return every indexed trigger, other than ``trigger``, overlapping it."""
+        with self._lock:
+            return self._overlaps_locked(trigger)
+
+    def extend_with_report(self, triggers: Iterable[str]) -> Dict[str, List[str]]:
+        """Index ``triggers`` in order, reporting each one's earlier overlaps.
+
+        A single pass covers overlaps with the triggers indexed beforehand as
+        well as between the new triggers themselves.
+        """
+        report: Dict[str, List[str]] = {}
+        with self._lock:
+            for trigger in triggers:
+                found = self._overlaps_locked(trigger)
+                if found:
+                    report[trigger] = found
+                self._add_locked(trigger)
+        return report
+
+    # ------------------------------------------------------------------
+    # Internal logic
+    # ------------------------------------------------------------------
+    def _add_locked(self, trigger: str) -> None:
+        if not trigger or trigger in self._triggers:
+            return
+        self._triggers.add(trigger)
+        insort(self._forward, trigger)
+        insort(self._reverse, trigger[::-1])
+
+    def _remove_locked(self, trigger: str) -> None:
+        if trigger not in self._triggers:
+            return
+        self._triggers.discard(trigger)
+        _remove_sorted(self._forward, trigger)
+        _remove_sorted(self._reverse, trigger[::-1])
+
+    def _overlaps_locked(self, trigger: str) -> List[str]:
+        if not trigger:
+            return []
+        triggers = self._triggers
+        found: Set[str] = set()
+        for end in range(1, len(trigger)):
+            if trigger[:end] in triggers:
+                found.add(trigger[:end])
+            if trigger[-end:] in triggers:
+                found.add(trigger[-end:])
+        found.update(_extensions(self._forward, trigger))
+        found.update(key[::-1] for key in _extensions(self._reverse, trigger[::-1]))
+        found.discard(trigger)
+        return sorted(found)
@@ -0,0 +1,486 @@
+"""Pattern triggers for OpenKeyFlow.
+
+A trigger written as ``re:<pattern>`` matches typed text against a regular
+expression instead of a literal string, for example ``re:ticket#(\\d+)`` or
+``re:(?i)\\bbrb``. Every pattern is compiled into one nondeterministic
+automaton, and its deterministic states are built lazily as characters
+arrive. Each keystroke then costs one cached transition, however many
+patterns there are.
+
+Supported syntax: literals, ``.``, ``[...]`` classes with ranges and
+negation, ``\\d \\w \\s`` and their negations, groups (capturing, ``(?:...)``
+and ``(?P<name>...)``), ``|``, and the quantifiers ``* + ? {m} {m,} {m,n}``.
+A leading ``(?i)`` makes the pattern case-insensitive. A leading ``^``
+anchors it to the start of a word (after whitespace), and a leading ``\\b``
+to any word boundary. Matches always end at the last typed character and
+span at most :data:`PATTERN_WINDOW` characters.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Sequence, Set, Tuple
+
+PATTERN_PREFIX = "re:"
+# Typed characters kept for pattern matches; longer matches are not reported.
+PATTERN_WINDOW = 64
+# Cached deterministic states before the cache is flushed and rebuilt.
+MAX_DFA_STATES = 4096
+# Largest count allowed in a ``{m,n}`` quantifier.
+MAX_REPEAT = 100
+
+_ANCHOR_NONE = 0
+_ANCHOR_START = 1
+_ANCHOR_WORD = 2
+
+_SPECIAL = set("()|*+?{}[].\\^$")
+_CONTROLS = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+Predicate = Callable[[str], bool]
+
+
+class PatternError(ValueError):
+    """Raised for pattern triggers outside the supported syntax."""
+
+
+class PatternMatch(NamedTuple):
+    trigger: str
+    output: str | None
+    # The typed text the pattern matched, which the expansion replaces.
+    text: str
+    # Captured groups by number (``"1"``) and by name; unmatched groups are "".
+    groups: Dict[str, str]
+
+
+def is_pattern(trigger: str) -> bool:
+    return trigger.startswith(PATTERN_PREFIX)
+
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+# ----------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------
+class _Parser:
+    """Recursive-descent parser producing a small regex syntax tree.
+
+    Nodes are tuples: ``("char", predicate)``, ``("cat", [nodes])``,
+    ``("alt", [nodes])``, ``("repeat", node, min, max_or_None)`` and
+    ``("empty",)``. Groups only matter to Python's ``re``, which extracts the
+    captures once the automaton has found a match.
+    """
+
+    def __init__(self, text: str, ignorecase: bool) -> None:
+        self.text = text
+        self.pos = 0
+        self.ignorecase = ignorecase
+
+    def parse(self) -> tuple:
+        node = self._alternation()
+        if self.pos != len(self.text):
+            raise PatternError(f"unbalanced ')' at position {self.pos}")
+        return node
+
+    def _peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def _take(self) -> str:
+        char = self._peek()
+        if not char:
+            raise PatternError("pattern ends unexpectedly")
+        self.pos += 1
+        return char
+
+    def _alternation(self) -> tuple:
+        branches = [self._concatenation()]
+        while self._peek() == "|":
+            self.pos += 1
+            branches.append(self._concatenation())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _concatenation(self) -> tuple:
+        items = []
+        while self._peek() not in ("", "|", ")"):
+            items.append(self._repeat())
+        if not items:
+            return ("empty",)
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def _repeat(self) -> tuple:
+        node = self._atom()
+        char = self._peek()
+        if char in ("*", "+", "?"):
+            self.pos += 1
+            low, high = {"*": (0, None), "+": (1, None), "?": (0, 1)}[char]
+        elif char == "{" and re.match(r"\{\d+(,\d*)?\}", self.text[self.pos :]):
+            end = self.text.index("}", self.pos)
+            low_text, _, high_text = self.text[self.pos + 1 : end].partition(",")
+            low = int(low_text)
+            if "," not in self.text[self.pos : end]:
+                high = low
+            else:
+                high = int(high_text) if high_text else None
+            self.pos = end + 1
+            if (high is not None and high < low) or max(low, high or 0) > MAX_REPEAT:
+                raise PatternError(f"repeat counts must be ordered and at most {MAX_REPEAT}")
+        else:
+            return node
+        if self._peek() in ("?", "+"):
+            raise PatternError("lazy and possessive quantifiers are not supported")
+        return ("repeat", node, low, high)
+
+    def _atom(self) -> tuple:
+        char = self._take()
+        if char == "(":
+            if self.text.startswith("?:", self.pos):
+                self.pos += 2
+            elif self.text.startswith("?P<", self.pos):
+                end = self.text.find(">", self.pos)
+                if end < 0:
+                    raise PatternError("unterminated group name")
+                self.pos = end + 1
+            elif self._peek() == "?":
+                raise PatternError("only (?:...) and (?P<name>...) groups are supported")
+            node = self._alternation()
+            if self._take() != ")":
+                raise PatternError("missing ')'")
+            return node
+        if char == "[":
+            return ("char", self._class())
+        if char == ".":
+            return ("char", lambda c: c != "\n")
+        if char == "\\":
+            return ("char", self._escape())
+        if char == "^":
+            raise PatternError("'^' is only supported at the start of a pattern")
+        if char == "$":
+            raise PatternError("'$' is not needed; matches always end at the typed character")
+        if char in _SPECIAL:
+            raise PatternError(f"unexpected '{char}' at position {self.pos - 1}")
+        return ("char", self._literal(char))
+
+    def _literal(self, char: str) -> Predicate:
+        if self.ignorecase and char.lower() != char.upper():
+            folded = char.lower()
+            return lambda c: c.lower() == folded
+        return lambda c: c == char
+
+    def _escape(self) -> Predicate:
+        char = self._take()
+        categories = {
+            "d": str.isdecimal,
+            "w": is_word_char,
+            "s": str.isspace,
+        }
+        if char.lower() in categories:
+            test = categories[char.lower()]
+            if char.isupper():
+                return lambda c: not test(c)
+            return test
+        if char in _CONTROLS:
+            return self._literal(_CONTROLS[char])
+        if char.isalnum():
+            raise PatternError(f"unsupported escape '\\{char}'")
+        return self._literal(char)
+
+    def _class(self) -> Predicate:
+        negated = self._peek() == "^"
+        if negated:
+            self.pos += 1
+        chars: Set[str] = set()
+        ranges: List[Tuple[str, str]] = []
+        tests: List[Predicate] = []
+        first = True
+        while True:
+            char = self._take()
+            if char == "]" and not first:
+                break
+            first = False
+            if char == "\\":
+                if self._peek() and self._peek().lower() in "dws":
+                    tests.append(self._escape())
+                    continue
+                char = self._take()
+                char = _CONTROLS.get(char, char)
+            if self._peek() == "-" and self.text[self.pos + 1 : self.pos + 2] not in ("", "]"):
+                self.pos += 1
+                high = self._take()
+                if high == "\\":
+                    high = self._take()
+                if high < char:
+                    raise PatternError(f"bad character range {char}-{high}")
+                ranges.append((char, high))
+            else:
+                chars.add(char)
+        ignorecase = self.ignorecase
+
+        def member(c: str) -> bool:
+            if c in chars or any(low <= c <= high for low, high in ranges):
+                return True
+            return any(test(c) for test in tests)
+
+        def predicate(c: str) -> bool:
+            found = member(c) or (ignorecase and (member(c.lower()) or member(c.upper())))
+            return found != negated
+
+        return predicate
+
+
+class _Compiled(NamedTuple):
+    tree: tuple
+    anchor: int
+    regex: "re.Pattern[str]"
+
+
+def group_names(trigger: str) -> Tuple[str, ...]:
+    """Names a template may use for the groups of a pattern trigger."""
+    if not is_pattern(trigger):
+        return ()
+    try:
+        regex = compile_pattern(trigger).regex
+    except PatternError:
+        return ()
+    return tuple(str(number) for number in range(1, regex.groups + 1)) + tuple(regex.groupindex)
+
+
+def compile_pattern(trigger: str) -> _Compiled:
+    """Parse a ``re:`` trigger, raising :class:`PatternError` if unsupported."""
+    body = trigger[len(PATTERN_PREFIX) :] if is_pattern(trigger) else trigger
+    flags = 0
+    if body.startswith("(?i)"):
+        body = body[4:]
+        flags = re.IGNORECASE
+    anchor = _ANCHOR_NONE
+    rest = body
+    if rest.startswith("^"):
+        anchor, rest = _ANCHOR_START, rest[1:]
+    elif rest.startswith("\\b"):
+        anchor, rest = _ANCHOR_WORD, rest[2:]
+    if not rest:
+        raise PatternError("pattern is empty")
+    tree = _Parser(rest, bool(flags)).parse()
+    if anchor != _ANCHOR_NONE and tree[0] == "alt":
+        raise PatternError("wrap alternatives in a group after a leading anchor")
+    try:
+        regex = re.compile(f"(?:{body})\\Z", flags)
+    except re.error as exc:
+        raise PatternError(str(exc)) from None
+    return _Compiled(tree, anchor, regex)
+
+
+# ----------------------------------------------------------------------
+# Automaton
+# ----------------------------------------------------------------------
+class _DState:
+    """A deterministic state: a set of NFA states plus its cached moves."""
+
+    __slots__ = ("nfa", "moves", "accepts", "next")
+
+    def __init__(self, nfa: FrozenSet[int], moves: Tuple[Tuple[Predicate, int], ...], accepts: Tuple[int, ...]) -> None:
+        self.nfa = nfa
+        self.moves = moves
+        self.accepts = accepts
+        self.next: Dict[str, _DState] = {}
+
+
+class PatternSet:
+    """Every pattern trigger compiled into one lazily determinized automaton.
+
+    Pattern sets are immutable apart from their transition cache, which only
+    the keyboard hook thread touches. Invalid patterns are skipped; storage
+    rejects them before they are saved.
+    """
+
+    def __init__(self, hotkeys: Dict[str, str | None]) -> None:
+        self._entries: List[Tuple[str, str | None, "re.Pattern[str]"]] = []
+        # NFA: per state, a predicate (or None) and up to two successors.
+        # Predicate states consume a character; the others are epsilon moves,
+        # and a state whose successors are both -1 accepts pattern ``_accept``.
+        self._preds: List[Predicate | None] = []
+        self._out: List[Tuple[int, int]] = []
+        self._accept: Dict[int, int] = {}
+        starts: Dict[int, List[int]] = {_ANCHOR_NONE: [], _ANCHOR_START: [], _ANCHOR_WORD: []}
+        for trigger, output in hotkeys.items():
+            try:
+                compiled = compile_pattern(trigger)
+            except PatternError:
+                continue
+            index = len(self._entries)
+            self._entries.append((trigger, output, compiled.regex))
+            accept = self._state(None, (-1, -1))
+            self._accept[accept] = index
+            starts[compiled.anchor].append(self._build(compiled.tree, accept))
+        self._hotkeys = {trigger: output for trigger, output, _ in self._entries}
+        self._restart = self._closure(starts[_ANCHOR_NONE])
+        self._word_restart = self._closure(starts[_ANCHOR_WORD])
+        self._states: Dict[FrozenSet[int], _DState] = {}
+        self.start = self._intern(
+            self._restart | self._word_restart | self._closure(starts[_ANCHOR_START])
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hotkeys(self) -> Dict[str, str | None]:
+        return dict(self._hotkeys)
+
+    def lookup(self, trigger: str) -> Tuple[str, str | None] | None:
+        if trigger not in self._hotkeys:
+            return None
+        return trigger, self._hotkeys[trigger]
+
+    def step(self, state: _DState, char: str) -> _DState:
+        """Return the state after typing ``char``; one dict lookup once cached."""
+        following = state.next.get(char)
+        if following is not None:
+            return following
+        reached: Set[int] = set()
+        for predicate, target in state.moves:
+            if predicate(char):
+                reached.add(target)
+        nfa = self._closure(reached) | self._restart
+        if not is_word_char(char):
+            nfa |= self._word_restart
+        if len(self._states) >= MAX_DFA_STATES:
+            for cached in self._states.values():
+                cached.next.clear()
+            self._states.clear()
+        following = self._intern(nfa)
+        state.next[char] = following
+        return following
+
+    def match(self, state: _DState, buffer: Sequence[str]) -> PatternMatch | None:
+        """Return the longest pattern match ending the buffer, if ``state`` accepts.
+
+        The automaton only says which patterns match. Python's ``re`` then
+        finds their span and groups in the buffered text, which happens only
+        on keystrokes that complete a match.
+        """
+        if not state.accepts:
+            return None
+        text = str(buffer)
+        best = None
+        for index in state.accepts:
+            trigger, output, regex = self._entries[index]
+            found = regex.search(text)
+            if found is not None and (best is None or found.start() < best[0].start()):
+                best = (found, trigger, output)
+        if best is None:
+            return None
+        found, trigger, output = best
+        groups = {str(number): value or "" for number, value in enumerate(found.groups(), 1)}
+        groups.update((name, value or "") for name, value in found.groupdict().items())
+        return PatternMatch(trigger, output, text[found.start() :], groups)
+
+    # ------------------------------------------------------------------
+    # Construction helpers
+    # ------------------------------------------------------------------
+    def _state(self, predicate: Predicate | None, out: Tuple[int, int]) -> int:
+        self._preds.append(predicate)
+        self._out.append(out)
+        return len(self._preds) - 1
+
+    def _build(self, node: tuple, following: int) -> int:
+        """Add states for ``node`` that continue to ``following``; return its entry."""
+        kind = node[0]
+        if kind == "char":
+            return self._state(node[1], (following, -1))
+        if kind == "empty":
+            return following
+        if kind == "cat":
+            for item in reversed(node[1]):
+                following = self._build(item, following)
+            return following
+        if kind == "alt":
+            entries = [self._build(branch, following) for branch in node[1]]
+            entry = entries[-1]
+            for branch_entry in reversed(entries[:-1]):
+                entry = self._state(None, (branch_entry, entry))
+            return entry
+        _, item, low, high = node
+        if high is None:
+            # A loop state that either enters the item again or leaves.
+            loop = self._state(None, (-1, following))
+            self._out[loop] = (self._build(item, loop), following)
+            following = loop
+        else:
+            for _ in range(high - low):
+                following = self._state(None, (self._build(item, following), following))
+        for _ in range(low):
+            following = self._build(item, following)
+        return following
+
+    def _closure(self, states) -> FrozenSet[int]:
+        seen: Set[int] = set()
+        stack = list(states)
+        while stack:
+            state = stack.pop()
+            if state < 0 or state in seen:
+                continue
+            seen.add(state)
+            if self._preds[state] is None:
+                stack.extend(self._out[state])
+        return frozenset(seen)
+
+    def _intern(self, nfa: FrozenSet[int]) -> _DState:
+        state = self._states.get(nfa)
+        if state is None:
+            moves = tuple(
+                (self._preds[s], self._out[s][0]) for s in sorted(nfa) if self._preds[s] is not None
+            )
+            accepts = tuple(sorted(self._accept[s] for s in nfa if s in self._accept))
+            state = self._states[nfa] = _DState(nfa, moves, accepts)
+        return state
+
+
+class PatternCursor:
+    """The automaton state after each buffered character; hook thread only.
+
+    States are kept for the characters the :class:`KeyRing` still holds, so a
+    backspace steps back to the previous state instead of re-running the
+    automaton. When the pattern set or buffer capacity changes, the buffered
+    text is replayed through the new automaton.
+    """
+
+    __slots__ = ("patterns", "_states", "_capacity")
+
+    def __init__(self) -> None:
+        self.patterns: PatternSet | None = None
+        self._states: List[_DState] = []
+        self._capacity = 0
+
+    def bind(self, patterns: PatternSet | None, buffer: Sequence[str], capacity: int) -> None:
+        if patterns is self.patterns and capacity == self._capacity:
+            return
+        self.patterns = patterns
+        self._capacity = capacity
+        self._states = []
+        if patterns is not None:
+            state = patterns.start
+            for index in range(len(buffer)):
+                state = patterns.step(state, buffer[index])
+                self._states.append(state)
+
+    @property
+    def current(self) -> _DState | None:
+        if self.patterns is None:
+            return None
+        return self._states[-1] if self._states else self.patterns.start
+
+    def push(self, char: str) -> None:
+        patterns = self.patterns
+        if patterns is None:
+            return
+        state = self._states[-1] if self._states else patterns.start
+        self._states.append(patterns.step(state, char))
+        if len(self._states) > self._capacity:
+            del self._states[0]
+
+    def pop(self) -> None:
+        if self._states:
+            self._states.pop()
+
+    def clear(self) -> None:
+        self._states.clear()
@@ -0,0 +1,87 @@
+"""Incremental substring search over hotkeys for OpenKeyFlow."""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+from . import storage
+
+
+def _fold(trigger: str, output: str) -> str:
+    # Triggers never contain a newline and queries come from a single-line
+    # field, so a match cannot straddle the two parts.
+    return f"{trigger}\n{output}".lower()
+
+
+class SearchIndex:
+    """Case-insensitive substring search over triggers and outputs.
+
+    Each hotkey is kept as one folded string holding its trigger and output,
+    about the size of the output itself, and a query scans them all. Folding
+    and scanning are meant to run off the GUI thread; the index is safe to
+    update and query from different threads.
+    """
+
+    def __init__(self, hotkeys: Dict[str, str] | None = None) -> None:
+        self._folded: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.apply_delta(hotkeys or {})
+
+    def __len__(self) -> int:
+        return len(self._folded)
+
+    def apply_delta(
+        self,
+        added: Dict[str, str] | None = None,
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Drop ``removed``, then index ``added`` (replacing existing entries)."""
+        folded = {trigger: _fold(trigger, output) for trigger, output in (added or {}).items()}
+        with self._lock:
+            for trigger in removed:
+                self._folded.pop(trigger, None)
+            self._folded.update(folded)
+
+    def query(self, text: str) -> Set[str] | None:
+        """Return the triggers whose trigger or output contains ``text``.
+
+        ``None`` means the query is empty and every hotkey matches.
+        """
+        needle = text.lower()
+        if not needle:
+            return None
+        with self._lock:
+            return {trigger for trigger, folded in self._folded.items() if needle in folded}
+
+
+class StoreSearch:
+    """Search the hotkey store itself, keeping no outputs in memory.
+
+    Meant for stores that serve outputs lazily. Edits not stored yet come from
+    ``pending`` as ``(added, removed)`` and take precedence over the store, so
+    :meth:`apply_delta` has nothing to do. Queries run off the GUI thread like
+    those of :class:`SearchIndex`.
+    """
+
+    def __init__(self, pending: Callable[[], Tuple[Dict[str, str], Set[str]]]) -> None:
+        self._pending = pending
+
+    def apply_delta(
+        self,
+        added: Dict[str, str] | None = None,
+        removed: Iterable[str] = (),
+    ) -> None:
+        return
+
+    def query(self, text: str) -> Set[str] | None:
+        """Return the triggers whose trigger or output contains ``text``."""
+        needle = text.lower()
+        if not needle:
+            return None
+        # Read pending edits first: one stored meanwhile is then in the store.
+        added, removed = self._pending()
+        found = storage.search_hotkeys(needle)
+        found.difference_update(removed)
+        found.difference_update(added)
+        found.update(trigger for trigger, output in added.items() if needle in _fold(trigger, output))
+        return found
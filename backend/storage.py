@@ -2,24 +2,113 @@
 from __future__ import annotations
 
 import csv
+import gc
+import hashlib
+import io
 import json
+import marshal
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+from collections import ChainMap
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+from .matcher import SuffixMatcher
+from .overlap import OverlapIndex
+from .patterns import PatternError, compile_pattern, is_pattern
+from .templates import TemplateError, compile_template
 
 _BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = _BASE_DIR / "okf_data"
 HOTKEYS_FILE = DATA_DIR / "hotkeys.json"
+JOURNAL_FILE = DATA_DIR / "hotkeys.journal"
+# Journal detached by a running compaction; replayed after the snapshot and
+# before the live journal if a crash interrupts the compaction.
+COMPACTING_JOURNAL_FILE = DATA_DIR / "hotkeys.journal.compacting"
+DATABASE_FILE = DATA_DIR / "hotkeys.db"
 CONFIG_FILE = DATA_DIR / "config.json"
 CSV_TEMPLATE = DATA_DIR / "export_sample.csv"
+TRACE_FILE = DATA_DIR / "keystrokes.trace"
+MATCHER_CACHE_FILE = DATA_DIR / "matcher.cache"
+
+STORAGE_BACKENDS = ("json", "journal", "sqlite")
+TRACE_MODES = ("off", "redacted", "full")
+JOURNAL_COMPACT_BYTES = 256 * 1024
+CSV_IMPORT_BATCH_SIZE = 1000
+# Bumped whenever the cached matcher layout changes.
+MATCHER_CACHE_VERSION = 3
+_MATCHER_CACHE_MAGIC = b"OKFMATCH"
+_MATCHER_CACHE_HEADER = struct.Struct("<8sI")
 
 DEFAULT_CONFIG = {
     "dark_mode": False,
     "cooldown": 0.3,
     "paste_delay": 0.05,
+    "capture_typeahead": False,
+    "storage_backend": "json",
+    "trace_recording": "off",
+    "hot_reload": True,
     "accepted_use_policy": False,
 }
 
 
+
+class MatcherCacheKey(NamedTuple):
+    """Identifies the hotkey store contents a cached matcher was built from."""
+
+    backend: str
+    # ``(file name, mtime_ns, size)`` for each store file that exists.
+    stats: Tuple[Tuple[str, int, int], ...]
+    digest: str
+
+
+class CsvImportBatch(NamedTuple):
+    """Validated rows from a streaming CSV import plus progress so far."""
+
+    hotkeys: Dict[str, str]
+    skipped: int
+    bytes_read: int
+    total_bytes: int
+    # Triggers in ``hotkeys`` mapped to the triggers they overlap.
+    conflicts: Dict[str, List[str]]
+
+
+_backend = "json"
+# Guards appends to and rotation of the journal.
+_journal_lock = threading.RLock()
+# Guards rewrites of the hotkeys snapshot; taken before ``_journal_lock``.
+_snapshot_lock = threading.RLock()
+_compactor: threading.Thread | None = None
+# One connection shared by the GUI and the injector thread, serialized here;
+# taken after ``_snapshot_lock`` and ``_journal_lock`` when both are needed.
+_db_lock = threading.RLock()
+_connection: sqlite3.Connection | None = None
+
+
+def set_backend(name: str) -> None:
+    """Select how hotkey edits are persisted; unknown names fall back to JSON."""
+    global _backend, _connection
+    with _db_lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+        _backend = name if name in STORAGE_BACKENDS else "json"
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def lazy_outputs() -> bool:
+    """Whether outputs can be fetched one at a time with :func:`get_output`."""
+    return _backend == "sqlite"
+
+
 def ensure_data_dir() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     if not HOTKEYS_FILE.exists():
@@ -32,24 +121,390 @@ def ensure_data_dir() -> None:
             writer.writerow(["Trigger", "Output"])
 
 
-def load_hotkeys() -> Dict[str, str]:
+def load_hotkeys(*, strict: bool = False) -> Dict[str, str]:
+    """Load every hotkey with its output.
+
+    File backends load the hotkeys snapshot and replay any journaled edits on
+    top of it. A malformed snapshot is normally read as empty and reset; with
+    ``strict`` it raises :class:`ValueError` instead. Strict loads never write
+    to the store, so a watcher reloading with them does not wake itself up.
+    """
+    if not strict:
+        ensure_data_dir()
+    if _backend == "sqlite":
+        with _database() as db:
+            return dict(db.execute("SELECT trigger, output FROM hotkeys"))
+    return _load_file_hotkeys(strict)
+
+
+def load_triggers() -> List[str]:
+    """Load only the triggers, leaving outputs in the store where possible."""
+    if _backend == "sqlite":
+        ensure_data_dir()
+        with _database() as db:
+            return [row[0] for row in db.execute("SELECT trigger FROM hotkeys")]
+    return list(load_hotkeys())
+
+
+def load_output_digests() -> Dict[str, int]:
+    """Map each trigger to the ``hash()`` of its output without keeping outputs."""
+    if _backend == "sqlite":
+        ensure_data_dir()
+        with _database() as db:
+            rows = db.execute("SELECT trigger, output FROM hotkeys")
+            return {trigger: hash(output) for trigger, output in rows}
+    return {trigger: hash(output) for trigger, output in load_hotkeys().items()}
+
+
+def search_hotkeys(text: str) -> Set[str]:
+    """Return the triggers whose trigger or output contains ``text``, ignoring case.
+
+    The SQLite backend scans the table without loading it; the file backends
+    read the whole store.
+    """
+    needle = text.lower()
+    if _backend == "sqlite":
+        ensure_data_dir()
+        with _database() as db:
+            rows = db.execute(
+                "SELECT trigger FROM hotkeys WHERE instr(fold(trigger), ?) OR instr(fold(output), ?)",
+                (needle, needle),
+            )
+            return {row[0] for row in rows}
+    return {
+        trigger
+        for trigger, output in load_hotkeys().items()
+        if needle in trigger.lower() or needle in output.lower()
+    }
+
+
+def get_output(trigger: str) -> str | None:
+    """Fetch a single output by trigger, or ``None`` when it does not exist."""
+    if _backend == "sqlite":
+        with _database() as db:
+            row = db.execute("SELECT output FROM hotkeys WHERE trigger = ?", (trigger,)).fetchone()
+        return row[0] if row else None
+    return load_hotkeys().get(trigger)
+
+
+def _load_file_hotkeys(strict: bool = False) -> Dict[str, str]:
+    with _snapshot_lock, _journal_lock:
+        hotkeys = _read_snapshot(strict)
+        journaled = _replay_journal(COMPACTING_JOURNAL_FILE, hotkeys)
+        journaled |= _replay_journal(JOURNAL_FILE, hotkeys)
+        if journaled and _backend != "journal" and not strict:
+            # Fold edits left over from journal mode back into the snapshot.
+            _write_snapshot(hotkeys)
+    if _backend == "journal" and not strict:
+        _maybe_compact()
+    return hotkeys
+
+
+def save_hotkeys(hotkeys: Dict[str, str]) -> None:
+    """Rewrite the whole hotkeys snapshot atomically and reset the journal."""
+    ensure_data_dir()
+    if _backend == "sqlite":
+        with _database() as db:
+            with db:
+                db.execute("DELETE FROM hotkeys")
+                db.executemany("INSERT INTO hotkeys (trigger, output) VALUES (?, ?)", hotkeys.items())
+        return
+    with _snapshot_lock, _journal_lock:
+        _write_snapshot(hotkeys)
+
+
+def save_hotkey_changes(
+    hotkeys: Dict[str, str],
+    added: Dict[str, str] | None = None,
+    removed: Iterable[str] = (),
+) -> None:
+    """Persist an edit to ``hotkeys``, the full set after the change.
+
+    The journal backend appends only ``removed`` and ``added`` as one record
+    and the SQLite backend updates just those rows. The JSON backend rewrites
+    the snapshot.
+    """
+    if _backend == "sqlite":
+        ensure_data_dir()
+        with _database() as db:
+            with db:
+                db.executemany("DELETE FROM hotkeys WHERE trigger = ?", ((t,) for t in removed))
+                db.executemany(
+                    "INSERT OR REPLACE INTO hotkeys (trigger, output) VALUES (?, ?)",
+                    (added or {}).items(),
+                )
+        return
+    if _backend != "journal":
+        save_hotkeys(hotkeys)
+        return
+    record = {"del": list(removed), "set": dict(added or {})}
     ensure_data_dir()
+    with _journal_lock:
+        with JOURNAL_FILE.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    _maybe_compact()
+
+
+def compact_journal() -> None:
+    """Fold the journal into the snapshot without blocking new appends.
+
+    The live journal is renamed aside under the journal lock, so edits made
+    while the snapshot is rewritten start a fresh journal.
+    """
+    with _journal_lock:
+        if not COMPACTING_JOURNAL_FILE.exists():
+            if not JOURNAL_FILE.exists():
+                return
+            os.replace(JOURNAL_FILE, COMPACTING_JOURNAL_FILE)
+    with _snapshot_lock:
+        if not COMPACTING_JOURNAL_FILE.exists():
+            # A full save_hotkeys() already superseded this compaction.
+            return
+        hotkeys = _read_snapshot()
+        _replay_journal(COMPACTING_JOURNAL_FILE, hotkeys)
+        _write_atomic(HOTKEYS_FILE, json.dumps(hotkeys, indent=4, ensure_ascii=False))
+        COMPACTING_JOURNAL_FILE.unlink()
+
+
+def matcher_cache_key() -> MatcherCacheKey:
+    """Fingerprint the hotkey store for :func:`save_matcher_cache`.
+
+    Take the key before reading the hotkeys the matcher is built from, so an
+    edit made in between makes the cache stale rather than wrong.
+    """
+    with _snapshot_lock, _journal_lock, _db_lock:
+        return MatcherCacheKey(_backend, _store_stats(), _store_digest())
+
+
+def load_matcher_cache() -> SuffixMatcher | None:
+    """Return the cached matcher if it still matches the hotkey store.
+
+    Unchanged modification times and sizes are trusted as is. Otherwise the
+    store is hashed, and a cache whose contents still match is reused and
+    re-stamped in the background.
+    """
+    try:
+        data = MATCHER_CACHE_FILE.read_bytes()
+        magic, header_size = _MATCHER_CACHE_HEADER.unpack_from(data)
+        if magic != _MATCHER_CACHE_MAGIC:
+            return None
+        header_end = _MATCHER_CACHE_HEADER.size + header_size
+        version, tag, backend, stats, digest = marshal.loads(data[_MATCHER_CACHE_HEADER.size : header_end])
+    except (OSError, struct.error, EOFError, ValueError, TypeError):
+        return None
+    if version != MATCHER_CACHE_VERSION or tag != sys.implementation.cache_tag or backend != _backend:
+        return None
+    with _snapshot_lock, _journal_lock, _db_lock:
+        current_stats = _store_stats()
+        if stats != current_stats:
+            if digest != _store_digest():
+                return None
+            key = MatcherCacheKey(backend, current_stats, digest)
+            threading.Thread(
+                target=_write_matcher_cache,
+                args=(key, data[header_end:]),
+                name="MatcherCacheWriter",
+                daemon=True,
+            ).start()
+    # The payload holds only dicts and strings, which cannot form a cycle;
+    # left on, the collector would rescan the growing heap many times over.
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        buckets, patterns = marshal.loads(data[header_end:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    finally:
+        if collecting:
+            gc.enable()
+    if not isinstance(buckets, dict) or not isinstance(patterns, dict):
+        return None
+    return SuffixMatcher.from_state(buckets, patterns)
+
+
+def save_matcher_cache(matcher: SuffixMatcher, key: MatcherCacheKey) -> None:
+    """Write ``matcher`` to the cache on a background thread.
+
+    ``matcher`` is immutable, so it is serialized while the engine keeps
+    using it.
+    """
+
+    def write() -> None:
+        _write_matcher_cache(key, marshal.dumps(matcher.state()))
+
+    threading.Thread(target=write, name="MatcherCacheWriter", daemon=True).start()
+
+
+def _write_matcher_cache(key: MatcherCacheKey, payload: bytes) -> None:
+    header = marshal.dumps(
+        (MATCHER_CACHE_VERSION, sys.implementation.cache_tag, key.backend, key.stats, key.digest)
+    )
+    data = _MATCHER_CACHE_HEADER.pack(_MATCHER_CACHE_MAGIC, len(header)) + header + payload
+    try:
+        _write_atomic(MATCHER_CACHE_FILE, data)
+    except OSError:
+        pass
+
+
+def store_files() -> List[Path]:
+    """Files holding the active backend's hotkeys, whether or not they exist."""
+    if _backend == "sqlite":
+        return [DATABASE_FILE]
+    return [HOTKEYS_FILE, COMPACTING_JOURNAL_FILE, JOURNAL_FILE]
+
+
+def _store_stats() -> Tuple[Tuple[str, int, int], ...]:
+    stats = []
+    for path in store_files():
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        stats.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(stats)
+
+
+def _store_digest() -> str:
+    digest = hashlib.sha256()
+    for path in store_files():
+        try:
+            with path.open("rb") as f:
+                digest.update(path.name.encode("utf-8") + b"\0")
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def _maybe_compact() -> None:
+    global _compactor
+    try:
+        size = JOURNAL_FILE.stat().st_size
+    except OSError:
+        return
+    if size < JOURNAL_COMPACT_BYTES:
+        return
+    with _journal_lock:
+        if _compactor is not None and _compactor.is_alive():
+            return
+        _compactor = threading.Thread(target=compact_journal, name="JournalCompactor", daemon=True)
+        _compactor.start()
+
+
+@contextmanager
+def _database() -> Iterator[sqlite3.Connection]:
+    """Hold ``_db_lock`` and yield the hotkeys database, opening it on first use.
+
+    Opening may seed the database from the hotkey files, so the file locks are
+    taken first then, in the snapshot, journal, database order used everywhere.
+    """
+    with _db_lock:
+        if _connection is not None:
+            yield _connection
+            return
+    with _snapshot_lock, _journal_lock, _db_lock:
+        yield _db()
+
+
+def _db() -> sqlite3.Connection:
+    """Open the hotkeys database on first use.
+
+    Callers must hold ``_snapshot_lock``, ``_journal_lock`` and ``_db_lock``,
+    or go through :func:`_database`. A new database is seeded once from
+    ``hotkeys.json`` and its journal.
+    """
+    global _connection
+    if _connection is None:
+        connection = sqlite3.connect(str(DATABASE_FILE), check_same_thread=False)
+        # SQLite's lower() only folds ASCII; search folds like str.lower().
+        connection.create_function("fold", 1, str.lower)
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hotkeys (trigger TEXT PRIMARY KEY, output TEXT NOT NULL)"
+            )
+            if connection.execute("PRAGMA user_version").fetchone()[0] == 0:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO hotkeys (trigger, output) VALUES (?, ?)",
+                    _load_file_hotkeys().items(),
+                )
+                connection.execute("PRAGMA user_version = 1")
+        _connection = connection
+    return _connection
+
+
+def _read_snapshot(strict: bool = False) -> Dict[str, str]:
     with HOTKEYS_FILE.open("r", encoding="utf-8") as f:
         try:
             data = json.load(f)
         except json.JSONDecodeError:
-            data = {}
+            if strict:
+                raise
+            data = None
     if not isinstance(data, dict):
-        data = {}
-    if not data:
+        if strict:
+            raise ValueError(f"{HOTKEYS_FILE.name} does not hold an object")
+        # Reset a malformed snapshot; one that already holds {} is left alone.
         HOTKEYS_FILE.write_text("{}", encoding="utf-8")
+        data = {}
     return {str(k): str(v) for k, v in data.items()}
 
 
-def save_hotkeys(hotkeys: Dict[str, str]) -> None:
-    ensure_data_dir()
-    with HOTKEYS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(hotkeys, f, indent=4, ensure_ascii=False)
+def _write_snapshot(hotkeys: Dict[str, str]) -> None:
+    """Write the snapshot and drop journals it supersedes; hold both locks."""
+    _write_atomic(HOTKEYS_FILE, json.dumps(hotkeys, indent=4, ensure_ascii=False))
+    for journal in (COMPACTING_JOURNAL_FILE, JOURNAL_FILE):
+        if journal.exists():
+            journal.unlink()
+
+
+def _replay_journal(path: Path, hotkeys: Dict[str, str]) -> bool:
+    """Apply the records in ``path`` to ``hotkeys``; return whether any existed.
+
+    Replay stops at the first unreadable line, which is how a record cut short
+    by a crash shows up. The journal is truncated there so later appends do
+    not end up glued to the torn record.
+    """
+    if not path.exists():
+        return False
+    valid_bytes = 0
+    with path.open("rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                record = None
+            if not isinstance(record, dict) or not line.endswith(b"\n"):
+                break
+            for trigger in record.get("del", ()):
+                hotkeys.pop(str(trigger), None)
+            for trigger, output in (record.get("set") or {}).items():
+                hotkeys[str(trigger)] = str(output)
+            valid_bytes += len(line)
+    if valid_bytes < path.stat().st_size:
+        with path.open("r+b") as f:
+            f.truncate(valid_bytes)
+    return True
+
+
+def _write_atomic(path: Path, content: str | bytes) -> None:
+    """Replace ``path`` with ``content`` so readers never see a partial file."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        binary = isinstance(content, bytes)
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
 
 
 def load_config() -> Dict[str, float]:
@@ -67,8 +522,7 @@ def save_config(config: Dict[str, float]) -> None:
     ensure_data_dir()
     merged = DEFAULT_CONFIG.copy()
     merged.update(config)
-    with CONFIG_FILE.open("w", encoding="utf-8") as f:
-        json.dump(merged, f, indent=2)
+    _write_atomic(CONFIG_FILE, json.dumps(merged, indent=2))
 
 
 def export_hotkeys_to_csv(path: Path, hotkeys: Dict[str, str]) -> None:
@@ -80,12 +534,99 @@ def export_hotkeys_to_csv(path: Path, hotkeys: Dict[str, str]) -> None:
             writer.writerow([trigger, output])
 
 
+def validate_hotkey(trigger: str, output: str) -> str | None:
+    """Return why a hotkey cannot be stored, or ``None`` when it is valid."""
+    if not trigger:
+        return "Trigger is required."
+    if " " in trigger:
+        return "Triggers cannot contain spaces."
+    if is_pattern(trigger):
+        try:
+            compile_pattern(trigger)
+        except PatternError as exc:
+            return f"Invalid pattern trigger: {exc}."
+    if not output:
+        return "Output is required."
+    return None
+
+
+def validate_template(trigger: str, output: str, hotkeys: Dict[str, str]) -> str | None:
+    """Return why ``output`` cannot expand alongside ``hotkeys``, or ``None``."""
+
+    def resolve(name: str) -> str | None:
+        return output if name == trigger else hotkeys.get(name)
+
+    try:
+        compile_template(trigger, output, resolve)
+    except TemplateError as exc:
+        return f"Invalid output: {exc}."
+    return None
+
+
 def import_hotkeys_from_csv(path: Path) -> Iterable[Tuple[str, str]]:
     path = Path(path)
     with path.open("r", encoding="utf-8") as f:
         reader = csv.DictReader(f, skipinitialspace=True)
         for row in reader:
-            trigger = (row.get("Trigger") or row.get("trigger") or row.get("Hotkey") or "").strip()
-            output = (row.get("Output") or row.get("output") or row.get("Text") or "").strip()
+            trigger, output = _csv_row(row)
             if trigger and output:
                 yield trigger, output
+
+
+def iter_csv_import_batches(
+    path: Path,
+    existing: Dict[str, str],
+    batch_size: int = CSV_IMPORT_BATCH_SIZE,
+    overlaps: OverlapIndex | None = None,
+) -> Iterator[CsvImportBatch]:
+    """Stream a CSV import as batches of new or changed hotkeys.
+
+    Rows that fail :func:`validate_hotkey`, repeat a trigger seen earlier in
+    the file, or match an ``existing`` hotkey exactly are skipped and counted.
+    So are rows whose output fails :func:`validate_template` against the
+    existing hotkeys and the rows imported before it: a snippet must be
+    defined before the row that uses it.
+    The final batch is always yielded, even when empty, so callers see 100%.
+
+    When ``overlaps`` indexes the existing triggers, each batch also reports
+    which imported triggers overlap an existing or earlier imported one. The
+    index is extended as rows are accepted, so the whole file takes one pass.
+    """
+    path = Path(path)
+    total_bytes = path.stat().st_size
+    seen = set()
+    # Accepted rows shadow the existing hotkeys they replace.
+    imported: Dict[str, str] = {}
+    merged = ChainMap(imported, existing)
+    batch: Dict[str, str] = {}
+    skipped = 0
+    with path.open("rb") as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline=""), skipinitialspace=True)
+        for row in reader:
+            trigger, output = _csv_row(row)
+            if (
+                validate_hotkey(trigger, output)
+                or trigger in seen
+                or existing.get(trigger) == output
+                or validate_template(trigger, output, merged)
+            ):
+                skipped += 1
+                continue
+            seen.add(trigger)
+            imported[trigger] = output
+            batch[trigger] = output
+            if len(batch) >= batch_size:
+                yield CsvImportBatch(batch, skipped, raw.tell(), total_bytes, _report(overlaps, batch))
+                batch = {}
+                skipped = 0
+    yield CsvImportBatch(batch, skipped, total_bytes, total_bytes, _report(overlaps, batch))
+
+
+def _report(overlaps: OverlapIndex | None, batch: Dict[str, str]) -> Dict[str, List[str]]:
+    return overlaps.extend_with_report(batch) if overlaps is not None else {}
+
+
+def _csv_row(row: Dict[str, str]) -> Tuple[str, str]:
+    trigger = (row.get("Trigger") or row.get("trigger") or row.get("Hotkey") or "").strip()
+    output = (row.get("Output") or row.get("output") or row.get("Text") or "").strip()
+    return trigger, output
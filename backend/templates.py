@@ -0,0 +1,255 @@
+"""Expansion templates for OpenKeyFlow.
+
+An output may contain fields in braces, which are filled in when the
+expansion fires:
+
+``{date}``, ``{time}``, ``{datetime}``
+    The current date or time. A ``strftime`` format may follow a colon,
+    e.g. ``{date:%d/%m/%Y}``.
+``{clipboard}``
+    The text on the user's clipboard.
+``{snippet:<trigger>}``
+    Another trigger's output, with its own fields filled in.
+``{cursor}``
+    Where the text cursor is left once the expansion is pasted.
+``{1}``, ``{<name>}``
+    A group captured by a pattern trigger.
+
+Any other text in braces is pasted as written, and doubling the braces of a
+field (``{{date}}``) pastes the field itself.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple
+
+from .patterns import group_names
+
+DATE_FORMATS = {
+    "date": "%Y-%m-%d",
+    "time": "%H:%M",
+    "datetime": "%Y-%m-%d %H:%M",
+}
+# Deepest chain of snippets inside snippets.
+MAX_NESTING = 16
+
+_FIELD = re.compile(r"\{\{(\w+)(:[^{}]*)?\}\}|\{(\w+)(?::([^{}]*))?\}")
+
+_TEXT = 0
+_NOW = 1
+_CLIPBOARD = 2
+_GROUP = 3
+_CURSOR = 4
+
+_Part = Tuple[int, str]
+
+
+class TemplateError(ValueError):
+    """Raised for snippet cycles and references to unknown snippets."""
+
+
+class Rendered(NamedTuple):
+    text: str
+    # Characters after the ``{cursor}`` field; the caret moves back this far.
+    cursor: int
+
+
+class Template:
+    """An output parsed into text and fields, ready to render.
+
+    Snippets are inlined when the template is compiled, so rendering is a
+    single pass over the parts. Templates without dynamic fields render to a
+    result computed up front.
+    """
+
+    __slots__ = ("_parts", "_static")
+
+    def __init__(self, parts: Sequence[_Part]) -> None:
+        merged: List[_Part] = []
+        for kind, value in parts:
+            if kind == _TEXT and merged and merged[-1][0] == _TEXT:
+                merged[-1] = (_TEXT, merged[-1][1] + value)
+            elif kind != _TEXT or value:
+                merged.append((kind, value))
+        self._parts = tuple(merged)
+        self._static: Rendered | None = None
+        if all(kind in (_TEXT, _CURSOR) for kind, _ in merged):
+            self._static = self.render()
+
+    @classmethod
+    def literal(cls, text: str) -> Template:
+        return cls([(_TEXT, text)])
+
+    def render(
+        self,
+        groups: Dict[str, str] | None = None,
+        clipboard: Callable[[], str] | None = None,
+    ) -> Rendered:
+        """Fill in the fields; ``clipboard`` is only called if one is used."""
+        if self._static is not None:
+            return self._static
+        pieces: List[str] = []
+        length = 0
+        cursor_at = -1
+        now = None
+        clipboard_text = None
+        for kind, value in self._parts:
+            if kind == _TEXT:
+                piece = value
+            elif kind == _NOW:
+                if now is None:
+                    now = datetime.now()
+                piece = now.strftime(value)
+            elif kind == _CLIPBOARD:
+                if clipboard_text is None:
+                    clipboard_text = clipboard() if clipboard is not None else ""
+                piece = clipboard_text
+            elif kind == _GROUP:
+                piece = groups.get(value, "") if groups else ""
+            else:
+                if cursor_at < 0:
+                    cursor_at = length
+                continue
+            pieces.append(piece)
+            length += len(piece)
+        return Rendered("".join(pieces), length - cursor_at if cursor_at >= 0 else 0)
+
+
+def compile_template(
+    trigger: str,
+    output: str,
+    resolve: Callable[[str], str | None],
+    references: Set[str] | None = None,
+) -> Template:
+    """Compile ``output`` for ``trigger``, looking snippets up with ``resolve``.
+
+    Every snippet looked up, directly or not, is added to ``references``,
+    including one that turns out to be unknown.
+    Raises :class:`TemplateError` for cycles and unknown snippets.
+    """
+    if references is None:
+        references = set()
+    return Template(_parse(output, group_names(trigger), resolve, [trigger], references))
+
+
+def _parse(
+    output: str,
+    groups: Sequence[str],
+    resolve: Callable[[str], str | None],
+    stack: List[str],
+    references: Set[str],
+) -> List[_Part]:
+    parts: List[_Part] = []
+    position = 0
+    for found in _FIELD.finditer(output):
+        parts.append((_TEXT, output[position : found.start()]))
+        position = found.end()
+        escaped, escaped_arg, name, arg = found.groups()
+        if escaped is not None:
+            if escaped in DATE_FORMATS or escaped in groups or escaped in ("clipboard", "cursor", "snippet"):
+                parts.append((_TEXT, found.group(0)[1:-1]))
+            else:
+                parts.append((_TEXT, found.group(0)))
+        elif name in DATE_FORMATS:
+            parts.append((_NOW, arg or DATE_FORMATS[name]))
+        elif name == "clipboard" and arg is None:
+            parts.append((_CLIPBOARD, ""))
+        elif name == "cursor" and arg is None:
+            parts.append((_CURSOR, ""))
+        elif name == "snippet" and arg:
+            parts.extend(_snippet(arg.strip(), resolve, stack, references))
+        elif name in groups and arg is None:
+            parts.append((_GROUP, name))
+        else:
+            parts.append((_TEXT, found.group(0)))
+    parts.append((_TEXT, output[position:]))
+    return parts
+
+
+def _snippet(
+    trigger: str,
+    resolve: Callable[[str], str | None],
+    stack: List[str],
+    references: Set[str],
+) -> List[_Part]:
+    if trigger in stack:
+        chain = " -> ".join(stack[stack.index(trigger) :] + [trigger])
+        raise TemplateError(f"snippet cycle {chain}")
+    if len(stack) > MAX_NESTING:
+        raise TemplateError(f"snippets nested more than {MAX_NESTING} deep")
+    # Recorded even when unknown, so defining the snippet later recompiles.
+    references.add(trigger)
+    output = resolve(trigger)
+    if output is None:
+        raise TemplateError(f"unknown snippet '{trigger}'")
+    # Nested snippets never see the firing trigger's groups.
+    return _parse(output, (), resolve, stack + [trigger], references)
+
+
+class TemplateLibrary:
+    """Compiled templates by trigger, kept in step with the hotkeys.
+
+    Outputs with fields are compiled when their hotkeys are added, or on
+    their first expansion when the output was not known then, and kept until
+    the trigger or a snippet it includes changes. Outputs without fields
+    never need a template. Reads take no lock; compiling is serialized.
+    """
+
+    def __init__(self, resolve: Callable[[str], str | None]) -> None:
+        self._resolve = resolve
+        self._templates: Dict[str, Template] = {}
+        # Snippet trigger -> triggers whose templates inline it.
+        self._dependents: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        trigger: str,
+        output: str,
+        groups: Dict[str, str] | None = None,
+        clipboard: Callable[[], str] | None = None,
+    ) -> Rendered:
+        if "{" not in output:
+            return Rendered(output, 0)
+        template = self._templates.get(trigger)
+        if template is None:
+            with self._lock:
+                template = self._compile_locked(trigger, output)
+        return template.render(groups, clipboard)
+
+    def update(self, added: Dict[str, str | None] | None = None, removed: Iterable[str] = ()) -> None:
+        """Drop templates affected by the change, then compile ``added``.
+
+        Call after the change is visible to the library's ``resolve``.
+        """
+        added = added or {}
+        with self._lock:
+            for trigger in list(removed) + list(added):
+                self._discard_locked(trigger)
+            for trigger, output in added.items():
+                if output is not None and "{" in output:
+                    self._compile_locked(trigger, output)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self._dependents.clear()
+
+    def _compile_locked(self, trigger: str, output: str) -> Template:
+        references: Set[str] = set()
+        try:
+            template = compile_template(trigger, output, self._resolve, references)
+        except TemplateError:
+            # Storage rejects these on save; paste the output as written.
+            template = Template.literal(output)
+        for reference in references:
+            self._dependents.setdefault(reference, set()).add(trigger)
+        self._templates[trigger] = template
+        return template
+
+    def _discard_locked(self, trigger: str) -> None:
+        self._templates.pop(trigger, None)
+        for dependent in self._dependents.pop(trigger, ()):
+            self._templates.pop(dependent, None)
@@ -0,0 +1,122 @@
+"""Compact binary recording of the keyboard events seen by the trigger engine."""
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple
+
+MAGIC = b"OKFTRACE"
+VERSION = 1
+FLAG_REDACTED = 0x01
+# Printable keys in redacted traces all become this key, so the trace keeps
+# timing, key classes, shift/caps state and backspaces but none of the text.
+REDACTED_KEY = "x"
+
+_HEADER = struct.Struct("<8sBB")
+# Time since the previous record in microseconds, kind, name id.
+_RECORD = struct.Struct("<IBH")
+_MAX_DELTA_US = 0xFFFFFFFF
+_KIND_UP = 0
+_KIND_DOWN = 1
+# Declares the name behind a new id; followed by a length byte and UTF-8 name.
+_KIND_NAME = 0xFF
+_EVENT_KINDS = {"up": _KIND_UP, "down": _KIND_DOWN}
+_KIND_TYPES = {_KIND_UP: "up", _KIND_DOWN: "down"}
+
+
+class TraceEvent(NamedTuple):
+    """One recorded event, timed in nanoseconds from the start of the trace."""
+
+    timestamp_ns: int
+    event_type: str
+    name: str
+
+
+class TraceRecorder:
+    """Append keyboard events to a trace file.
+
+    Each event costs seven bytes plus a one-off declaration the first time a
+    key name is seen. Writes go through a buffered file, so :meth:`record` does
+    no I/O on most calls. With ``redact`` set, every single-character key name
+    is replaced by :data:`REDACTED_KEY` before it is written.
+    """
+
+    def __init__(self, path: Path, *, redact: bool = False) -> None:
+        self.path = Path(path)
+        self.redact = redact
+        self._file: BinaryIO | None = self.path.open("wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, FLAG_REDACTED if redact else 0))
+        self._names: Dict[str, int] = {}
+        self._last_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def record(self, event) -> None:
+        kind = _EVENT_KINDS.get(event.event_type)
+        if kind is None:
+            return
+        name = (event.name or "").lower()
+        if self.redact and len(name) == 1:
+            name = REDACTED_KEY
+        now = time.perf_counter_ns()
+        with self._lock:
+            file = self._file
+            if file is None:
+                return
+            name_id = self._names.get(name)
+            if name_id is None:
+                name_id = len(self._names)
+                if name_id > 0xFFFF:
+                    return
+                self._names[name] = name_id
+                encoded = name.encode("utf-8")[:255]
+                file.write(_RECORD.pack(0, _KIND_NAME, name_id) + bytes((len(encoded),)) + encoded)
+            delta_us = min((now - self._last_ns) // 1000, _MAX_DELTA_US)
+            # Carry the sub-microsecond remainder so long traces do not drift.
+            self._last_ns += delta_us * 1000
+            file.write(_RECORD.pack(delta_us, kind, name_id))
+
+    def close(self) -> None:
+        with self._lock:
+            file, self._file = self._file, None
+        if file is not None:
+            file.close()
+
+
+def read_trace(path: Path) -> Iterator[TraceEvent]:
+    """Yield the events of a trace file in recorded order."""
+    with Path(path).open("rb") as file:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a keystroke trace")
+        magic, version, _flags = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a keystroke trace")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+        names: List[str] = []
+        timestamp_us = 0
+        while True:
+            record = file.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                # A trace cut short by a crash ends at its last whole record.
+                return
+            delta_us, kind, name_id = _RECORD.unpack(record)
+            if kind == _KIND_NAME:
+                length = file.read(1)
+                if not length:
+                    return
+                names.append(file.read(length[0]).decode("utf-8", errors="replace"))
+                continue
+            timestamp_us += delta_us
+            if kind in _KIND_TYPES and name_id < len(names):
+                yield TraceEvent(timestamp_us * 1000, _KIND_TYPES[kind], names[name_id])
+
+
+def is_redacted(path: Path) -> bool:
+    with Path(path).open("rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is not a keystroke trace")
+    return bool(_HEADER.unpack(header)[2] & FLAG_REDACTED)
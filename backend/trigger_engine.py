@@ -1,18 +1,45 @@
 """Keyboard trigger monitoring for OpenKeyFlow."""
 from __future__ import annotations
 
+import os
+import queue
 import threading
 import time
-from typing import Callable, Dict, List, Tuple
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, NamedTuple, Set, Tuple
 
 import keyboard
 
-try:
-    import pyperclip
-except ImportError:  # pragma: no cover - optional dependency
-    pyperclip = None  # type: ignore
+from .clipboard import ClipboardSession, pyperclip
+from .keybuffer import KeyRing
+from .metrics import EngineMetrics
+from .matcher import SuffixMatcher
+from .patterns import PatternCursor
+from .templates import TemplateLibrary
+from .trace import TraceRecorder
+
+OUTPUT_CACHE_SIZE = 64
+
+# Notifications sent to engine listeners, with the value they carry.
+EVENT_FIRED = "fired"  # expansions fired so far
+EVENT_ENABLED = "enabled"  # new enabled state
+EVENT_ERROR = "error"  # message of a failed expansion
 
 SHIFT_KEYS = {"shift", "left shift", "right shift"}
+MODIFIER_KEYS = SHIFT_KEYS | {
+    "ctrl",
+    "left ctrl",
+    "right ctrl",
+    "alt",
+    "left alt",
+    "right alt",
+    "alt gr",
+    "windows",
+    "left windows",
+    "right windows",
+    "caps lock",
+}
 WHITESPACE = {" ", "\n", "\t"}
 SPECIAL_KEYS = {
     "space": " ",
@@ -44,36 +71,116 @@ SHIFTED_SYMBOLS = {
 }
 
 
+class InjectionPlan(NamedTuple):
+    """Keys that turn a typed trigger into its output."""
+
+    backspaces: int
+    text: str
+
+
+def plan_injection(trigger: str, output: str) -> InjectionPlan:
+    """Keep the part of the typed trigger the output starts with.
+
+    Only the characters after the shared prefix are erased, and only the rest
+    of the output is pasted, so ``-sig`` expanding to ``-signature`` costs no
+    backspaces and a six-character paste.
+    """
+    shared = len(os.path.commonprefix((trigger, output)))
+    return InjectionPlan(len(trigger) - shared, output[shared:])
+
+
+class _FireJob(NamedTuple):
+    trigger: str
+    output: str | None
+    # What was typed: the trigger itself, or the text a pattern matched.
+    typed: str
+    groups: Dict[str, str] | None
+    generation: int
+
+
+class EngineSnapshot(NamedTuple):
+    """Immutable view of everything the keyboard hook needs to match keys."""
+
+    version: int
+    matcher: SuffixMatcher
+    enabled: bool
+    cooldown: float
+    paste_delay: float
+    capture_typeahead: bool
+
+
+class _TypeaheadKey(NamedTuple):
+    name: str
+    scan_code: int | None
+    shifted: bool
+
+
+class _OutputCache:
+    """Small LRU of outputs fetched on demand through an output loader.
+
+    A load that overlaps a :meth:`discard` or :meth:`clear` is returned but
+    not kept, since it may have read the value being replaced.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def get(self, trigger: str, loader: Callable[[str], str | None]) -> str | None:
+        with self._lock:
+            output = self._entries.get(trigger)
+            if output is not None:
+                self._entries.move_to_end(trigger)
+                return output
+            version = self._version
+        output = loader(trigger)
+        if output is not None:
+            with self._lock:
+                if version == self._version:
+                    self._entries[trigger] = output
+                    while len(self._entries) > self._capacity:
+                        self._entries.popitem(last=False)
+        return output
+
+    def discard(self, triggers: Iterable[str]) -> None:
+        with self._lock:
+            self._version += 1
+            for trigger in triggers:
+                self._entries.pop(trigger, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+
 def _default_fire_callback(trigger: str, output: str) -> None:
     # Hook for tests – intentionally empty.
     return
 
 
-def safe_write(text: str, *, paste_delay: float = 0.05) -> None:
-    """Safely send text to the active window."""
-    if pyperclip is None:
-        keyboard.write(text, delay=0)
-        return
-
-    try:
-        previous = pyperclip.paste()
-    except Exception:
-        keyboard.write(text, delay=0)
-        return
-    try:
-        pyperclip.copy(text)
-        time.sleep(paste_delay)
-        keyboard.send("ctrl+v")
-        time.sleep(paste_delay)
-    finally:
-        try:
-            pyperclip.copy(previous)
-        except Exception:
-            pass
+def safe_write(
+    text: str,
+    *,
+    paste_delay: float = 0.05,
+    metrics: EngineMetrics | None = None,
+) -> None:
+    """Safely send text to the active window, restoring the clipboard at once."""
+    session = ClipboardSession(pyperclip)
+    session.paste(text, paste_delay=paste_delay, metrics=metrics)
+    session.restore()
 
 
 class TriggerEngine:
-    """Monitor keyboard events and expand matching triggers."""
+    """Monitor keyboard events and expand matching triggers.
+
+    The keyboard hook only detects matches; expansions are queued as fire jobs
+    and injected by a dedicated worker thread in the order they were detected.
+    Triggers and settings live in an :class:`EngineSnapshot` that writers
+    replace whole, so the hook reads it without any lock.
+    """
 
     def __init__(
         self,
@@ -82,154 +189,470 @@ class TriggerEngine:
         cooldown: float = 0.3,
         paste_delay: float = 0.05,
         fire_callback: Callable[[str, str], None] = _default_fire_callback,
+        capture_typeahead: bool = False,
+        output_loader: Callable[[str], str | None] | None = None,
+        matcher: SuffixMatcher | None = None,
+        clipboard: ClipboardSession | None = None,
     ) -> None:
-        self._hotkeys: Dict[str, str] = hotkeys or {}
-        self._sorted_triggers: List[Tuple[str, str]] = []
-        self._buffer = ""
-        self._max_len = 0
-        self._enabled = True
-        self._cooldown = cooldown
-        self._paste_delay = paste_delay
+        self._output_loader = output_loader
+        self._outputs = _OutputCache(OUTPUT_CACHE_SIZE)
+        self._pending_outputs: Callable[[str], Tuple[bool, str | None]] | None = None
+        if matcher is None:
+            matcher = SuffixMatcher(self._stored_outputs(hotkeys or {}))
+        self._templates = TemplateLibrary(self._lookup_output)
+        self._snapshot = EngineSnapshot(
+            version=0,
+            matcher=matcher,
+            enabled=True,
+            cooldown=max(0.0, cooldown),
+            paste_delay=max(0.0, paste_delay),
+            capture_typeahead=capture_typeahead,
+        )
         self._fire_callback = fire_callback
-
+        # Replaced, never mutated, so notifying needs no lock.
+        self._listeners: Tuple[Callable[[str, object], None], ...] = ()
+        # Serializes writers building and publishing snapshots; never taken
+        # by the keyboard hook.
+        self._write_lock = threading.Lock()
+
+        # State below is owned by the keyboard hook thread.
+        self._buffer = KeyRing(self._snapshot.matcher.window)
+        self._cursor = PatternCursor()
         self._last_fire = 0.0
-        self._suppress_events = False
+        self._held_keys: Set[str] = set()
         self._shift_active = False
         self._caps_lock = keyboard.is_toggled("caps lock") if hasattr(keyboard, "is_toggled") else False
 
-        self._lock = threading.RLock()
+        # Hand-off between the hook and the injector. The hook only takes this
+        # lock while an expansion is queued or being injected.
+        self._inject_lock = threading.Lock()
+        self._pending_jobs = 0
+        self._generation = 0
+        self._jobs: "queue.Queue[_FireJob]" = queue.Queue()
+        self._typeahead: Deque[_TypeaheadKey] = deque()
+        # Key names the injector is about to send, paired with whether the
+        # event is a type-ahead replay that should be matched like typing.
+        self._expected: Deque[Tuple[str, bool]] = deque()
+
         self._thread: threading.Thread | None = None
+        self._injector: threading.Thread | None = None
         self._hooked = False
+        self._unhook: Callable[[], None] | None = None
+        self._clipboard = clipboard if clipboard is not None else ClipboardSession(pyperclip)
         self._fired_count = 0
-
-        self.update_hotkeys(self._hotkeys)
+        self._recorder: TraceRecorder | None = None
+        self.metrics = EngineMetrics()
+        self._templates.update(hotkeys)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
+    @property
+    def snapshot(self) -> EngineSnapshot:
+        return self._snapshot
+
     def start(self) -> None:
+        if not (self._injector and self._injector.is_alive()):
+            self._injector = threading.Thread(
+                target=self._inject_loop, name="TriggerEngineInjector", daemon=True
+            )
+            self._injector.start()
         if self._thread and self._thread.is_alive():
             return
         self._thread = threading.Thread(target=self._run, name="TriggerEngine", daemon=True)
         self._thread.start()
 
     def set_enabled(self, enabled: bool) -> None:
-        with self._lock:
-            self._enabled = enabled
-            if not enabled:
-                self._buffer = ""
+        with self._write_lock:
+            changed = enabled != self._snapshot.enabled
+            self._publish(enabled=enabled)
+        if not enabled:
+            self._cancel_pending()
+            self._clipboard.restore()
+        if changed:
+            self._notify(EVENT_ENABLED, enabled)
 
     def toggle_enabled(self) -> bool:
-        with self._lock:
-            self._enabled = not self._enabled
-            if not self._enabled:
-                self._buffer = ""
-            return self._enabled
+        with self._write_lock:
+            enabled = self._publish(enabled=not self._snapshot.enabled).enabled
+        if not enabled:
+            self._cancel_pending()
+            self._clipboard.restore()
+        self._notify(EVENT_ENABLED, enabled)
+        return enabled
+
+    def add_listener(self, listener: Callable[[str, object], None]) -> None:
+        """Call ``listener(event, value)`` for each ``EVENT_*`` notification.
+
+        Listeners run on the thread that caused the event, which may be the
+        keyboard hook or the injector, and must return quickly.
+        """
+        with self._write_lock:
+            self._listeners += (listener,)
+
+    def remove_listener(self, listener: Callable[[str, object], None]) -> None:
+        with self._write_lock:
+            self._listeners = tuple(known for known in self._listeners if known != listener)
 
     def update_hotkeys(self, hotkeys: Dict[str, str]) -> None:
-        with self._lock:
-            self._hotkeys = dict(hotkeys)
-            self._sorted_triggers = sorted(self._hotkeys.items(), key=lambda item: len(item[0]), reverse=True)
-            self._max_len = max((len(trigger) for trigger in self._hotkeys), default=0)
-            if len(self._buffer) > self._max_len:
-                self._buffer = self._buffer[-self._max_len :]
+        """Replace every trigger, rebuilding the match index from scratch."""
+        matcher = SuffixMatcher(self._stored_outputs(hotkeys))
+        with self._write_lock:
+            self._publish(matcher=matcher)
+            self._templates.clear()
+            self._templates.update(hotkeys)
+        self._outputs.clear()
+
+    def add_hotkey(self, trigger: str, output: str) -> None:
+        self.apply_delta({trigger: output})
+
+    def remove_hotkeys(self, triggers: Iterable[str]) -> None:
+        self.apply_delta(removed=triggers)
+
+    def apply_delta(
+        self,
+        added: Dict[str, str] | None = None,
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Update only the changed triggers; removals are applied before additions."""
+        added = added or {}
+        removed = list(removed)
+        with self._write_lock:
+            matcher = self._snapshot.matcher.updated(self._stored_outputs(added), removed)
+            self._publish(matcher=matcher)
+            self._outputs.discard(removed)
+            self._outputs.discard(added)
+            self._templates.update(added, removed)
+
+    def set_pending_outputs(self, lookup: Callable[[str], Tuple[bool, str | None]] | None) -> None:
+        """Serve lazily loaded outputs with unsaved edits from ``lookup`` first.
+
+        ``lookup(trigger)`` returns whether the trigger has an edit the output
+        loader cannot see yet, and that edit's output. Such outputs are never
+        cached; call :meth:`forget_outputs` once the edits are stored.
+        """
+        self._pending_outputs = lookup
+
+    def forget_outputs(self, triggers: Iterable[str]) -> None:
+        """Drop cached outputs of ``triggers`` so they are loaded again."""
+        self._outputs.discard(triggers)
 
     def set_cooldown(self, cooldown: float) -> None:
-        with self._lock:
-            self._cooldown = max(0.0, cooldown)
+        with self._write_lock:
+            self._publish(cooldown=max(0.0, cooldown))
 
     def set_paste_delay(self, paste_delay: float) -> None:
-        with self._lock:
-            self._paste_delay = max(0.0, paste_delay)
+        with self._write_lock:
+            self._publish(paste_delay=max(0.0, paste_delay))
+
+    def set_capture_typeahead(self, enabled: bool) -> None:
+        with self._write_lock:
+            if enabled == self._snapshot.capture_typeahead:
+                return
+            self._publish(capture_typeahead=enabled)
+            if self._unhook is not None:
+                self._unhook()
+                self._unhook = keyboard.hook(self._handle_event, suppress=enabled)
+
+    def restore_clipboard(self) -> None:
+        """Restore the user's clipboard now; call before exiting."""
+        self._clipboard.restore()
 
     def get_stats(self) -> Dict[str, int]:
-        with self._lock:
-            return {"fired": self._fired_count}
+        return {"fired": self._fired_count}
+
+    def set_metrics_enabled(self, enabled: bool) -> None:
+        self.metrics.enabled = enabled
+
+    def get_metrics(self) -> Dict[str, object]:
+        """Return a point-in-time copy of the latency histograms and counters."""
+        return self.metrics.snapshot()
+
+    def start_recording(self, path: Path, *, redact: bool = True) -> None:
+        """Record hook events to ``path``, replacing any recording in progress."""
+        recorder = TraceRecorder(path, redact=redact)
+        previous, self._recorder = self._recorder, recorder
+        if previous is not None:
+            previous.close()
+
+    def stop_recording(self) -> None:
+        recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    @property
+    def recording(self) -> bool:
+        return self._recorder is not None
 
     # ------------------------------------------------------------------
     # Internal logic
     # ------------------------------------------------------------------
+    def _stored_outputs(self, hotkeys: Dict[str, str]) -> Dict[str, str | None]:
+        """Drop outputs the engine will fetch on demand instead of keeping."""
+        if self._output_loader is not None:
+            return dict.fromkeys(hotkeys)
+        return hotkeys
+
+    def _lookup_output(self, trigger: str) -> str | None:
+        """Return the current output for exactly ``trigger``, loading it if needed."""
+        entry = self._snapshot.matcher.lookup(trigger)
+        if entry is None:
+            return None
+        output = entry[1]
+        if output is None and self._output_loader is not None:
+            output = self._load_output(trigger)
+        return output
+
+    def _load_output(self, trigger: str) -> str | None:
+        if self._pending_outputs is not None:
+            pending, output = self._pending_outputs(trigger)
+            if pending:
+                # Not cached: the store still holds the old value.
+                return output
+        return self._outputs.get(trigger, self._output_loader)
+
+    def _notify(self, event: str, value: object) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event, value)
+            except Exception:
+                pass
+
+    def _publish(self, **changes) -> EngineSnapshot:
+        """Swap in a new snapshot; callers must hold ``_write_lock``."""
+        current = self._snapshot
+        snapshot = current._replace(version=current.version + 1, **changes)
+        self._snapshot = snapshot
+        return snapshot
+
     def _run(self) -> None:
         if self._hooked:
             return
-        keyboard.hook(self._handle_event)
+        with self._write_lock:
+            self._unhook = keyboard.hook(
+                self._handle_event, suppress=self._snapshot.capture_typeahead
+            )
         self._hooked = True
         keyboard.wait()
 
-    def _handle_event(self, event) -> None:
+    def _handle_event(self, event) -> bool:
+        """Process one hook event; returning ``False`` blocks it in capture mode."""
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record(event)
+        metrics = self.metrics
+        if not metrics.enabled:
+            return self._process_event(event)
+        start = time.perf_counter_ns()
+        try:
+            return self._process_event(event)
+        finally:
+            metrics.hook.record(time.perf_counter_ns() - start)
+
+    def _process_event(self, event) -> bool:
         if event.event_type not in ("down", "up"):
-            return
+            return True
 
         name = (event.name or "").lower()
 
         if name in SHIFT_KEYS:
             self._shift_active = event.event_type == "down"
-            return
+            return True
 
         if name == "caps lock" and event.event_type == "down":
             self._caps_lock = not self._caps_lock
-            return
+            return True
 
         if event.event_type != "down":
+            if name in self._held_keys:
+                self._held_keys.discard(name)
+                return False
+            return True
+
+        snapshot = self._snapshot
+        matcher = snapshot.matcher
+        cursor = self._cursor
+        if self._buffer.capacity != matcher.window:
+            self._buffer.resize(matcher.window)
+            cursor.bind(matcher.patterns, self._buffer, self._buffer.capacity)
+        elif cursor.patterns is not matcher.patterns:
+            cursor.bind(matcher.patterns, self._buffer, self._buffer.capacity)
+
+        pending = False
+        replayed = False
+        if self._pending_jobs:
+            with self._inject_lock:
+                pending = bool(self._pending_jobs)
+                if pending and snapshot.capture_typeahead and name not in MODIFIER_KEYS:
+                    if self._expected and self._expected[0][0] == name:
+                        replayed = self._expected.popleft()[1]
+                        if not replayed:
+                            return True
+                    else:
+                        scan_code = getattr(event, "scan_code", None)
+                        self._typeahead.append(_TypeaheadKey(name, scan_code, self._shift_active))
+                        self._held_keys.add(name)
+                        if self.metrics.enabled:
+                            self.metrics.suppressed += 1
+                        return False
+
+        if not snapshot.enabled:
+            self._buffer.clear()
+            cursor.clear()
+            return True
+
+        if name == "backspace":
+            self._buffer.pop()
+            cursor.pop()
+            return True
+
+        if (pending and not replayed) or not matcher:
+            if pending and self.metrics.enabled:
+                self.metrics.dropped += 1
+            return True
+
+        char = self._translate_key(name)
+        if char is None:
+            return True
+
+        if char in WHITESPACE:
+            self._buffer.clear()
+            cursor.clear()
+            return True
+
+        self._buffer.append(char)
+        cursor.push(char)
+
+        if self.metrics.enabled:
+            match_start = time.perf_counter_ns()
+            match = self._match(matcher)
+            self.metrics.match.record(time.perf_counter_ns() - match_start)
+        else:
+            match = self._match(matcher)
+        if match is None:
+            return True
+
+        now = time.time()
+        # Replayed keys were typed during the previous injection, so the
+        # cooldown would otherwise swallow chained triggers typed at speed.
+        if not replayed and now - self._last_fire < snapshot.cooldown:
+            return True
+
+        self._last_fire = now
+        self._buffer.clear()
+        cursor.clear()
+        # Keys typed while jobs are pending are ignored, as they would be
+        # erased or interleaved by the injected backspaces and paste.
+        with self._inject_lock:
+            self._pending_jobs += 1
+            self._jobs.put(match._replace(generation=self._generation))
+        return True
+
+    def _match(self, matcher: SuffixMatcher) -> _FireJob | None:
+        """Return the longest literal or pattern match ending the buffer."""
+        match = matcher.match(self._buffer)
+        patterns = matcher.patterns
+        if patterns is not None:
+            state = self._cursor.current
+            if state.accepts:
+                found = patterns.match(state, self._buffer)
+                if found is not None and (match is None or len(found.text) > len(match[0])):
+                    return _FireJob(found.trigger, found.output, found.text, found.groups, 0)
+        if match is None:
+            return None
+        trigger, output = match
+        return _FireJob(trigger, output, trigger, None, 0)
+
+    def _cancel_pending(self) -> None:
+        """Drop queued fire jobs; a job already injecting runs to completion."""
+        with self._inject_lock:
+            self._generation += 1
+            while True:
+                try:
+                    self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending_jobs -= 1
+                if self.metrics.enabled:
+                    self.metrics.cancelled += 1
+
+    def _inject_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            try:
+                with self._inject_lock:
+                    cancelled = job.generation != self._generation
+                    self._expected.clear()
+                if not cancelled:
+                    self._fire(job, self._snapshot)
+            except Exception as exc:
+                self._notify(EVENT_ERROR, f"{job.trigger}: {exc}")
+            finally:
+                self._finish_job()
+
+    def _finish_job(self) -> None:
+        """Replay captured type-ahead, then close the job's suppression window.
+
+        Replay stops early when a replayed key queues another expansion; the
+        remaining keys are replayed after that expansion instead. Emptiness is
+        checked under the lock together with the pending counter, so a key
+        cannot be captured after the last replay and then stranded.
+        """
+        while True:
+            with self._inject_lock:
+                if not self._typeahead or self._pending_jobs > 1:
+                    self._expected.clear()
+                    self._pending_jobs -= 1
+                    return
+                key = self._typeahead.popleft()
+                self._expected.append((key.name, True))
+            try:
+                self._replay_key(key)
+            except Exception:
+                with self._inject_lock:
+                    self._expected.clear()
+
+    def _replay_key(self, key: _TypeaheadKey) -> None:
+        target = key.scan_code or key.name
+        if key.shifted and not self._shift_active:
+            keyboard.press("shift")
+            try:
+                keyboard.send(target)
+            finally:
+                keyboard.release("shift")
+        else:
+            keyboard.send(target)
+
+    def _fire(self, job: _FireJob, snapshot: EngineSnapshot) -> None:
+        trigger, output = job.trigger, job.output
+        if output is None and self._output_loader is not None:
+            output = self._load_output(trigger)
+        if output is None:
+            # Removed from the store after the match was queued.
             return
-
-        fired: Tuple[str, str] | None = None
-
-        with self._lock:
-            if not self._enabled or self._suppress_events or not self._sorted_triggers:
-                if name == "backspace":
-                    self._buffer = self._buffer[:-1]
-                return
-
-            if name == "backspace":
-                self._buffer = self._buffer[:-1]
-                return
-
-            char = self._translate_key(name)
-            if char is None:
-                return
-
-            if char in WHITESPACE:
-                self._buffer = ""
-                return
-
-            self._buffer = (self._buffer + char)[-self._max_len :]
-
-            match = self._find_match_locked()
-            if match is None:
-                return
-
-            trigger, output = match
-            now = time.time()
-            if now - self._last_fire < self._cooldown:
-                return
-
-            self._last_fire = now
-            fired = self._fire_locked(trigger, output)
-
-        if fired is not None:
-            fired_trigger, fired_output = fired
-            self._fire_callback(fired_trigger, fired_output)
-
-    def _find_match_locked(self) -> Tuple[str, str] | None:
-        for trigger, output in self._sorted_triggers:
-            if trigger and self._buffer.endswith(trigger):
-                return trigger, output
-        return None
-
-    def _fire_locked(self, trigger: str, output: str) -> Tuple[str, str] | None:
-        self._suppress_events = True
-        try:
-            for _ in range(len(trigger)):
-                keyboard.send("backspace")
-                time.sleep(self._paste_delay)
-            safe_write(output, paste_delay=self._paste_delay)
-            self._buffer = ""
-            self._fired_count += 1
-            return trigger, output
-        finally:
-            self._suppress_events = False
-        return None
+        rendered = self._templates.render(trigger, output, job.groups, self._clipboard.user_text)
+        plan = plan_injection(job.typed, rendered.text)
+        if snapshot.capture_typeahead:
+            injected = ["backspace"] * plan.backspaces + (["v"] if plan.text else [])
+            injected += ["left"] * rendered.cursor
+            with self._inject_lock:
+                self._expected.extend((name, False) for name in injected)
+        metrics = self.metrics
+        if plan.backspaces:
+            start = time.perf_counter_ns() if metrics.enabled else 0
+            # One call presses every backspace back to back; the OS queues
+            # them in order, so only the last one needs time to land.
+            keyboard.send(", ".join(["backspace"] * plan.backspaces))
+            time.sleep(snapshot.paste_delay)
+            if metrics.enabled:
+                metrics.backspace.record(time.perf_counter_ns() - start)
+        if plan.text:
+            self._clipboard.paste(plan.text, paste_delay=snapshot.paste_delay, metrics=metrics)
+        if rendered.cursor:
+            keyboard.send(", ".join(["left"] * rendered.cursor))
+        self._fired_count += 1
+        self._fire_callback(trigger, rendered.text)
+        self._notify(EVENT_FIRED, self._fired_count)
 
     def _translate_key(self, name: str) -> str | None:
         if len(name) == 1:
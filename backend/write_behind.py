@@ -0,0 +1,244 @@
+"""Write-behind persistence of hotkeys and config for OpenKeyFlow."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+from . import storage
+
+# Seconds without a change before pending edits are written.
+DEBOUNCE = 0.5
+# Longest a change waits while edits keep arriving.
+MAX_WAIT = 3.0
+# Seconds before a failed write is tried again.
+RETRY_DELAY = 2.0
+
+
+class WriteBehind:
+    """Coalesce hotkey and config saves and write them on a background thread.
+
+    Each hotkey edit is folded into one pending delta, where later edits to a
+    trigger replace earlier ones, and only the newest config is kept. A writer
+    thread stores them once no edit has arrived for ``debounce`` seconds, or
+    after ``max_wait`` seconds of continuous edits, through the storage
+    backend's own atomic writes. A write that fails is merged back under any
+    newer edits and retried.
+
+    ``hotkeys`` is the caller's live hotkey mapping and ``lock`` guards it; the
+    writer copies it under the lock when the backend rewrites the whole set.
+    Until an edit is stored, :meth:`pending_output` and :meth:`pending_changes`
+    serve it to readers that would otherwise load the old value from the
+    store, and ``on_written`` is
+    called on the writer thread with the triggers of each stored batch.
+    Call :meth:`close` before exiting to write anything still pending.
+    """
+
+    def __init__(
+        self,
+        hotkeys: Dict[str, str],
+        lock: threading.RLock,
+        *,
+        debounce: float = DEBOUNCE,
+        max_wait: float = MAX_WAIT,
+        on_written: Callable[[Set[str]], None] | None = None,
+    ) -> None:
+        self._hotkeys = hotkeys
+        self._hotkeys_lock = lock
+        self.debounce = max(0.0, debounce)
+        self.max_wait = max(self.debounce, max_wait)
+        self._condition = threading.Condition()
+        self._added: Dict[str, str] = {}
+        self._removed: Set[str] = set()
+        self._hotkeys_dirty = False
+        self._on_written = on_written
+        # The batch being written right now.
+        self._inflight_added: Dict[str, str] = {}
+        self._inflight_removed: Set[str] = set()
+        self._config_inflight = False
+        self._config: Dict[str, object] | None = None
+        # Monotonic deadlines for the next write; 0 while nothing is pending.
+        self._due = 0.0
+        self._latest = 0.0
+        self._writing = False
+        self._closed = False
+        self.last_error: Exception | None = None
+        self._thread: threading.Thread | None = None
+
+    def hotkeys_changed(self, added: Dict[str, str] | None = None, removed: Iterable[str] = ()) -> None:
+        """Queue an edit already applied to the live hotkeys."""
+        with self._condition:
+            self._merge_locked(added or {}, removed)
+            self._schedule_locked()
+
+    def config_changed(self, config: Dict[str, object]) -> None:
+        """Queue ``config`` to replace the stored config."""
+        with self._condition:
+            self._config = dict(config)
+            self._schedule_locked()
+
+    @property
+    def pending(self) -> bool:
+        with self._condition:
+            return self._has_pending_locked() or self._writing
+
+    def pending_triggers(self) -> Set[str]:
+        """Triggers edited locally whose change may not be stored yet."""
+        with self._condition:
+            return set(self._added) | self._removed | set(self._inflight_added) | self._inflight_removed
+
+    def pending_output(self, trigger: str) -> Tuple[bool, str | None]:
+        """Return whether ``trigger`` has an edit not stored yet, and its output.
+
+        The output is ``None`` when the pending edit removes the trigger.
+        """
+        with self._condition:
+            for added, removed in (
+                (self._added, self._removed),
+                (self._inflight_added, self._inflight_removed),
+            ):
+                if trigger in added:
+                    return True, added[trigger]
+                if trigger in removed:
+                    return True, None
+            return False, None
+
+    def pending_changes(self) -> Tuple[Dict[str, str], Set[str]]:
+        """Return the hotkey edits not stored yet as ``(added, removed)``."""
+        with self._condition:
+            added = dict(self._inflight_added)
+            removed = set(self._inflight_removed)
+            for trigger in self._removed:
+                added.pop(trigger, None)
+                removed.add(trigger)
+            for trigger, output in self._added.items():
+                removed.discard(trigger)
+                added[trigger] = output
+            return added, removed
+
+    @property
+    def config_pending(self) -> bool:
+        """Whether a local config change may not be stored yet."""
+        with self._condition:
+            return self._config is not None or self._config_inflight
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write pending changes now; return whether everything was written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._has_pending_locked():
+                self.last_error = None
+                self._due = self._latest = time.monotonic()
+                self._ensure_writer_locked()
+                self._condition.notify_all()
+            while self._has_pending_locked() or self._writing:
+                if self.last_error is not None and not self._writing:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Flush, then stop the writer thread."""
+        written = self.flush(timeout)
+        if not written:
+            # Last attempt on this thread; the writer may be backing off.
+            with self._condition:
+                if not self._writing and self._has_pending_locked():
+                    self._write_pending_locked()
+                written = not self._has_pending_locked()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        return written
+
+    # ------------------------------------------------------------------
+    # Internal logic
+    # ------------------------------------------------------------------
+    def _has_pending_locked(self) -> bool:
+        return self._hotkeys_dirty or self._config is not None
+
+    def _merge_locked(self, added: Dict[str, str], removed: Iterable[str]) -> None:
+        for trigger in removed:
+            self._added.pop(trigger, None)
+            self._removed.add(trigger)
+        for trigger, output in added.items():
+            self._removed.discard(trigger)
+            self._added[trigger] = output
+        self._hotkeys_dirty = True
+
+    def _schedule_locked(self) -> None:
+        now = time.monotonic()
+        if not self._latest:
+            self._latest = now + self.max_wait
+        self._due = min(now + self.debounce, self._latest)
+        self.last_error = None
+        self._ensure_writer_locked()
+        self._condition.notify_all()
+
+    def _ensure_writer_locked(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="StorageWriter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._closed:
+                if not self._has_pending_locked():
+                    self._condition.wait()
+                    continue
+                delay = self._due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                self._write_pending_locked()
+
+    def _write_pending_locked(self) -> None:
+        """Write one batch with the condition released while doing I/O."""
+        added, removed, hotkeys_dirty = self._added, self._removed, self._hotkeys_dirty
+        config = self._config
+        self._added, self._removed, self._hotkeys_dirty = {}, set(), False
+        self._config = None
+        self._due = self._latest = 0.0
+        self._writing = True
+        self._inflight_added, self._inflight_removed = added, removed
+        self._config_inflight = config is not None
+        self._condition.release()
+        error = None
+        try:
+            if hotkeys_dirty:
+                if storage.lazy_outputs():
+                    # Only the delta is written, and the live mapping may
+                    # hold no outputs to copy.
+                    hotkeys = {}
+                else:
+                    with self._hotkeys_lock:
+                        hotkeys = dict(self._hotkeys)
+                storage.save_hotkey_changes(hotkeys, added=added, removed=removed)
+                hotkeys_dirty = False
+                if self._on_written is not None:
+                    # Readers that loaded the old value meanwhile can reload it.
+                    self._on_written(set(added) | removed)
+            if config is not None:
+                storage.save_config(config)
+                config = None
+        except Exception as exc:
+            error = exc
+        finally:
+            self._condition.acquire()
+            self._writing = False
+            self._inflight_added, self._inflight_removed = {}, set()
+            self._config_inflight = False
+        if error is not None:
+            self.last_error = error
+            if hotkeys_dirty:
+                newer_added, newer_removed = self._added, self._removed
+                self._added, self._removed = added, removed
+                self._merge_locked(newer_added, newer_removed)
+            if config is not None and self._config is None:
+                self._config = config
+            self._due = self._latest = time.monotonic() + RETRY_DELAY
+        self._condition.notify_all()
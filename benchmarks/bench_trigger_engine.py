@@ -0,0 +1,221 @@
+"""Synthetic keystroke benchmark for :class:`backend.trigger_engine.TriggerEngine`.
+
+Drives ``TriggerEngine._handle_event`` with generated key streams through the
+fake ``keyboard``/``pyperclip`` modules, so it runs on any machine without a
+keyboard hook. Run it from the repository root::
+
+    python -m benchmarks.bench_trigger_engine
+    python -m benchmarks.bench_trigger_engine --quick
+    python -m benchmarks.bench_trigger_engine --sizes 10 1000 --mixes plain --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from . import fakes
+
+fake_keyboard, _ = fakes.install()
+
+from backend.trigger_engine import SHIFTED_SYMBOLS, TriggerEngine  # noqa: E402
+
+SIZES = (10, 1_000, 10_000, 100_000)
+LENGTHS = {
+    "short": (3, 6),
+    "mixed": (3, 16),
+    "long": (12, 32),
+}
+MIXES = ("plain", "shift", "caps", "backspace")
+TRIGGER_PREFIXES = "-;/"
+TRIGGER_ALPHABET = string.ascii_lowercase + string.digits
+_UNSHIFTED = {shifted: base for base, shifted in SHIFTED_SYMBOLS.items()}
+
+
+def make_hotkeys(size: int, lengths: str, rng: random.Random) -> Dict[str, str]:
+    low, high = LENGTHS[lengths]
+    hotkeys: Dict[str, str] = {}
+    while len(hotkeys) < size:
+        length = rng.randint(low, high)
+        trigger = rng.choice(TRIGGER_PREFIXES) + "".join(rng.choices(TRIGGER_ALPHABET, k=length - 1))
+        hotkeys[trigger] = f"expansion for {trigger}"
+    return hotkeys
+
+
+def _key_events(char: str, caps_on: bool) -> Iterator[fakes.FakeEvent]:
+    """Yield the down/up events a user would press to type ``char``."""
+    if char == " ":
+        name, shifted = "space", False
+    elif char.isalpha():
+        name = char.lower()
+        shifted = char.isupper() != caps_on
+    elif char in _UNSHIFTED:
+        name, shifted = _UNSHIFTED[char], True
+    else:
+        name, shifted = char, False
+    if shifted:
+        yield fakes.FakeEvent("down", "shift")
+    yield fakes.FakeEvent("down", name)
+    yield fakes.FakeEvent("up", name)
+    if shifted:
+        yield fakes.FakeEvent("up", "shift")
+
+
+def make_events(triggers: List[str], mix: str, count: int, rng: random.Random) -> List[fakes.FakeEvent]:
+    """Build a stream of about ``count`` events of prose with triggers mixed in."""
+    events: List[fakes.FakeEvent] = []
+    caps_on = False
+    while len(events) < count:
+        if rng.random() < 0.1:
+            word = rng.choice(triggers)
+        else:
+            word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            if mix == "shift" and rng.random() < 0.3:
+                word = word.capitalize()
+        if mix == "caps" and rng.random() < 0.1:
+            events.extend((fakes.FakeEvent("down", "caps lock"), fakes.FakeEvent("up", "caps lock")))
+            caps_on = not caps_on
+        for char in word:
+            events.extend(_key_events(char, caps_on))
+            if mix == "backspace" and rng.random() < 0.15:
+                events.extend(_key_events(rng.choice(string.ascii_lowercase), caps_on))
+                events.extend((fakes.FakeEvent("down", "backspace"), fakes.FakeEvent("up", "backspace")))
+        events.extend(_key_events(" ", caps_on))
+    return events
+
+
+def _percentile(samples: List[int], percentile: float) -> float:
+    index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+    return samples[index] / 1000
+
+
+def time_events(
+    engine: TriggerEngine,
+    events: Sequence,
+    timestamps_ns: Sequence[int] | None = None,
+) -> Tuple[List[int], int]:
+    """Feed ``events`` to a started engine, timing each ``_handle_event`` call.
+
+    Without ``timestamps_ns`` events are sent back to back, waiting out each
+    expansion untimed. With them, each event is sent at its offset from the
+    first one and expansions run concurrently, as they would for a real user.
+    Returns the per-event latencies and the wall time spent in the engine.
+    """
+    fake_keyboard.clear()
+    handle = engine._handle_event
+    clock = time.perf_counter_ns
+    samples = [0] * len(events)
+    idle_ns = 0
+    wall_start = clock()
+    for index, event in enumerate(events):
+        if timestamps_ns is not None:
+            delay_ns = wall_start + timestamps_ns[index] - clock()
+            if delay_ns > 0:
+                slept_from = clock()
+                time.sleep(delay_ns / 1e9)
+                idle_ns += clock() - slept_from
+        start = clock()
+        handle(event)
+        end = clock()
+        samples[index] = end - start
+        if timestamps_ns is None and engine._pending_jobs:
+            # A human types slower than the fake injector runs; wait for it so
+            # the following keys are matched instead of dropped as type-ahead.
+            while engine._pending_jobs:
+                time.sleep(0)
+            idle_ns += clock() - end
+    return samples, clock() - wall_start - idle_ns
+
+
+def summarize(samples: List[int], wall_ns: int) -> Dict[str, float]:
+    samples = sorted(samples)
+    if not samples:
+        return {"events": 0}
+    return {
+        "events": len(samples),
+        "events_per_sec": len(samples) / (max(wall_ns, 1) / 1e9),
+        "p50_us": _percentile(samples, 50),
+        "p90_us": _percentile(samples, 90),
+        "p99_us": _percentile(samples, 99),
+        "max_us": samples[-1] / 1000,
+    }
+
+
+def run_case(size: int, lengths: str, mix: str, event_count: int, seed: int) -> Dict[str, object]:
+    rng = random.Random(f"{seed}-{size}-{lengths}-{mix}")
+    hotkeys = make_hotkeys(size, lengths, rng)
+    events = make_events(list(hotkeys), mix, event_count, rng)
+
+    # tracemalloc slows allocation down, so memory and build time are
+    # measured on separate builds.
+    tracemalloc.start()
+    probe = TriggerEngine(hotkeys=hotkeys, cooldown=0.0, paste_delay=0.0)
+    memory_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del probe
+    build_start = time.perf_counter()
+    engine = TriggerEngine(hotkeys=hotkeys, cooldown=0.0, paste_delay=0.0)
+    build_seconds = time.perf_counter() - build_start
+
+    engine.start()
+    samples, wall_ns = time_events(engine, events)
+    engine.set_enabled(False)
+
+    return {
+        "size": size,
+        "lengths": lengths,
+        "mix": mix,
+        **summarize(samples, wall_ns),
+        "fired": engine.get_stats()["fired"],
+        "build_ms": build_seconds * 1000,
+        "memory_mb": memory_bytes / (1024 * 1024),
+    }
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    header = (
+        f"{'size':>7} {'lengths':>7} {'mix':>9} {'events/s':>11} {'p50 us':>8} "
+        f"{'p90 us':>8} {'p99 us':>8} {'max us':>9} {'fired':>6} {'build ms':>9} {'mem MB':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['size']:>7} {row['lengths']:>7} {row['mix']:>9} {row['events_per_sec']:>11,.0f} "
+            f"{row['p50_us']:>8.2f} {row['p90_us']:>8.2f} {row['p99_us']:>8.2f} {row['max_us']:>9.1f} "
+            f"{row['fired']:>6} {row['build_ms']:>9.1f} {row['memory_mb']:>7.1f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--lengths", nargs="+", choices=sorted(LENGTHS), default=list(LENGTHS))
+    parser.add_argument("--mixes", nargs="+", choices=MIXES, default=list(MIXES))
+    parser.add_argument("--events", type=int, default=50_000, help="events per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="10 and 1k triggers, 10k events per case")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes = [size for size in args.sizes if size <= 1_000]
+        args.events = min(args.events, 10_000)
+
+    results = [
+        run_case(size, lengths, mix, args.events, args.seed)
+        for size in args.sizes
+        for lengths in args.lengths
+        for mix in args.mixes
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
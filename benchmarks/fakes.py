@@ -0,0 +1,83 @@
+"""In-process stand-ins for ``keyboard`` and ``pyperclip``.
+
+Benchmarks and trace replays call :func:`install` before importing
+``backend`` so the trigger engine runs without an OS keyboard hook or a real
+clipboard. The fakes only record what would have been sent.
+"""
+from __future__ import annotations
+
+import sys
+import types
+from typing import List, NamedTuple
+
+
+class FakeEvent(NamedTuple):
+    """The subset of ``keyboard.KeyboardEvent`` the engine reads."""
+
+    event_type: str
+    name: str
+    scan_code: int | None = None
+
+
+class FakeKeyboard(types.ModuleType):
+    def __init__(self) -> None:
+        super().__init__("keyboard")
+        self.sent: List[str] = []
+        self.written: List[str] = []
+
+    def is_toggled(self, name: str) -> bool:
+        return False
+
+    def hook(self, callback, suppress: bool = False):
+        return lambda: None
+
+    def wait(self, *args, **kwargs) -> None:
+        return None
+
+    def send(self, hotkey, *args, **kwargs) -> None:
+        self.sent.append(str(hotkey))
+
+    def press(self, hotkey) -> None:
+        self.sent.append(f"+{hotkey}")
+
+    def release(self, hotkey) -> None:
+        self.sent.append(f"-{hotkey}")
+
+    def write(self, text: str, delay: float = 0, **kwargs) -> None:
+        self.written.append(text)
+
+    def add_hotkey(self, *args, **kwargs) -> None:
+        return None
+
+    def remove_hotkey(self, *args, **kwargs) -> None:
+        return None
+
+    def clear(self) -> None:
+        self.sent.clear()
+        self.written.clear()
+
+
+class FakeClipboard(types.ModuleType):
+    def __init__(self) -> None:
+        super().__init__("pyperclip")
+        self.text = ""
+
+    def paste(self) -> str:
+        return self.text
+
+    def copy(self, text: str) -> None:
+        self.text = text
+
+
+def install() -> tuple[FakeKeyboard, FakeClipboard]:
+    """Register the fakes in ``sys.modules``; must run before importing ``backend``."""
+    keyboard, clipboard = sys.modules.get("keyboard"), sys.modules.get("pyperclip")
+    if isinstance(keyboard, FakeKeyboard) and isinstance(clipboard, FakeClipboard):
+        return keyboard, clipboard
+    if "backend.trigger_engine" in sys.modules:
+        raise RuntimeError("install() must be called before backend is imported")
+    keyboard = FakeKeyboard()
+    clipboard = FakeClipboard()
+    sys.modules["keyboard"] = keyboard
+    sys.modules["pyperclip"] = clipboard
+    return keyboard, clipboard
@@ -0,0 +1,107 @@
+"""Replay a recorded keystroke trace through :class:`TriggerEngine`.
+
+Traces come from ``TriggerEngine.start_recording`` (or the ``trace_recording``
+config setting). The engine injects through the fake ``keyboard``/``pyperclip``
+modules, so replays are deterministic and safe to run anywhere::
+
+    python -m benchmarks.replay_trace okf_data/keystrokes.trace
+    python -m benchmarks.replay_trace trace.bin --hotkeys hotkeys.json --speed original
+
+``--speed max`` sends events back to back and reports throughput; ``--speed
+original`` keeps the recorded gaps so expansions overlap typing as they did
+when the trace was taken. Redacted traces keep timing but not text, so they
+exercise the hook without firing expansions.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from . import fakes
+
+fakes.install()
+
+from backend import storage  # noqa: E402
+from backend.trace import is_redacted, read_trace  # noqa: E402
+from backend.trigger_engine import TriggerEngine  # noqa: E402
+
+from .bench_trigger_engine import summarize, time_events  # noqa: E402
+
+
+def load_hotkeys(path: Path | None) -> Dict[str, str]:
+    if path is None:
+        config = storage.load_config()
+        storage.set_backend(str(config.get("storage_backend", "json")))
+        return storage.load_hotkeys()
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not contain a hotkey object")
+    return {str(trigger): str(output) for trigger, output in data.items()}
+
+
+def replay(
+    trace: Path,
+    hotkeys: Dict[str, str],
+    *,
+    original_speed: bool = False,
+    repeat: int = 1,
+) -> List[Dict[str, object]]:
+    trace_events = list(read_trace(trace))
+    events = [fakes.FakeEvent(event.event_type, event.name) for event in trace_events]
+    timestamps = [event.timestamp_ns for event in trace_events] if original_speed else None
+    results = []
+    for run in range(repeat):
+        engine = TriggerEngine(hotkeys=hotkeys, cooldown=0.0, paste_delay=0.0)
+        engine.set_metrics_enabled(True)
+        engine.start()
+        samples, wall_ns = time_events(engine, events, timestamps)
+        engine.set_enabled(False)
+        metrics = engine.get_metrics()
+        results.append(
+            {
+                "run": run + 1,
+                **summarize(samples, wall_ns),
+                "fired": engine.get_stats()["fired"],
+                "dropped": metrics["dropped"],
+                "match_p99_us": metrics["match"]["p99_us"],
+            }
+        )
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--hotkeys", type=Path, help="hotkeys JSON file (defaults to okf_data)")
+    parser.add_argument("--speed", choices=("max", "original"), default="max")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    hotkeys = load_hotkeys(args.hotkeys)
+    results = replay(
+        args.trace,
+        hotkeys,
+        original_speed=args.speed == "original",
+        repeat=max(1, args.repeat),
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    redacted = " (redacted)" if is_redacted(args.trace) else ""
+    print(f"{args.trace}{redacted}: {len(hotkeys)} hotkeys, speed={args.speed}")
+    for row in results:
+        if not row["events"]:
+            print(f"run {row['run']}: empty trace")
+            continue
+        print(
+            f"run {row['run']}: {row['events']} events, {row['events_per_sec']:,.0f} events/s, "
+            f"p50 {row['p50_us']:.2f} us, p90 {row['p90_us']:.2f} us, p99 {row['p99_us']:.2f} us, "
+            f"max {row['max_us']:.1f} us, fired {row['fired']}, dropped {row['dropped']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
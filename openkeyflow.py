@@ -6,11 +6,9 @@ import sys
 
 
 def _ensure_dependencies() -> None:
-    missing = [
-        name
-        for name in ("PyQt5", "keyboard", "pyperclip")
-        if importlib.util.find_spec(name) is None
-    ]
+    # Headless mode only needs Qt once the window is opened.
+    required = ("keyboard", "pyperclip") if "--headless" in sys.argv[1:] else ("PyQt5", "keyboard", "pyperclip")
+    missing = [name for name in required if importlib.util.find_spec(name) is None]
     if missing:
         joined = ", ".join(sorted(set(missing)))
         command = f"{sys.executable} -m pip install -r requirements.txt"